@@ -1,85 +1,128 @@
-import random
-from qiskit import QuantumCircuit
-from qiskit_aer import AerSimulator
+import numpy as np
 
-# Number of qubits (key length)
-n = 16  
+SECURITY_THRESHOLD = 11
 
-# Alice prepares random bits and bases
-alice_bits = [random.randint(0, 1) for _ in range(n)]
-alice_bases = [random.randint(0, 1) for _ in range(n)]  # 0 = Z-basis, 1 = X-basis
 
-# Eve measures alternate bits (0, 2, 4, ...)
-eve_bases = [random.randint(0, 1) if i % 2 == 0 else None for i in range(n)]
+def party_generators(seed=None, parties=("alice", "bob", "eve")):
+    """Independent generator per party from one seed (as in BB84/randomness.py)
 
-# Bob chooses random bases
-bob_bases = [random.randint(0, 1) for _ in range(n)]
+    `seed` may be an int, None (fresh OS entropy) or a SeedSequence.
+    """
+    root = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    return {name: np.random.default_rng(child) for name, child in zip(parties, root.spawn(len(parties)))}
 
-# Quantum circuit
-qc = QuantumCircuit(n, n)
 
-# Step 1: Alice encodes bits
-for i in range(n):
-    if alice_bits[i] == 1:
-        qc.x(i)
-    if alice_bases[i] == 1:
-        qc.h(i)
+def random_bits(rng, n):
+    """`n` random 0/1 ints, unpacked from random bytes"""
+    return np.unpackbits(np.frombuffer(rng.bytes((n + 7) // 8), dtype=np.uint8), count=n).tolist()
 
-# Step 2: Eve intercepts alternate bits
-for i in range(n):
-    if eve_bases[i] is not None:  
-        if eve_bases[i] == 1:
-            qc.h(i)
-        qc.measure(i, i)
-        qc.reset(i)
-        if random.randint(0, 1) == 1:
+
+def build_circuit(alice_bits, alice_bases, eve_bases, bob_bases, eve_resend):
+    from qiskit import QuantumCircuit
+
+    n = len(alice_bits)
+    # Quantum circuit
+    qc = QuantumCircuit(n, n)
+
+    # Step 1: Alice encodes bits
+    for i in range(n):
+        if alice_bits[i] == 1:
             qc.x(i)
         if alice_bases[i] == 1:
             qc.h(i)
 
-# Step 3: Bob measures
-for i in range(n):
-    if bob_bases[i] == 1:
-        qc.h(i)
-    qc.measure(i, i)
-
-# Run the circuit once
-sim = AerSimulator()
-result = sim.run(qc, shots=1).result()
-bob_results = list(result.get_counts().keys())[0]  
-bob_bits = [int(b) for b in bob_results[::-1]]
-
-# Step 4: Find matching bases and generate sifted key if QBER ≤ 11%
-matching_indices = []
-sifted_alice = []
-sifted_bob = []
-
-for i in range(n):
-    if alice_bases[i] == bob_bases[i]:
-        matching_indices.append(i)
-        sifted_alice.append(alice_bits[i])
-        sifted_bob.append(bob_bits[i])
-
-# Step 5: QBER calculation
-errors = sum(1 for a, b in zip(sifted_alice, sifted_bob) if a != b)
-qber = (errors / len(sifted_alice)) * 100 if len(sifted_alice) > 0 else 0
+    # Step 2: Eve intercepts alternate bits
+    for i in range(n):
+        if eve_bases[i] is not None:
+            if eve_bases[i] == 1:
+                qc.h(i)
+            qc.measure(i, i)
+            qc.reset(i)
+            if eve_resend[i] == 1:
+                qc.x(i)
+            if alice_bases[i] == 1:
+                qc.h(i)
+
+    # Step 3: Bob measures
+    for i in range(n):
+        if bob_bases[i] == 1:
+            qc.h(i)
+        qc.measure(i, i)
+    return qc
+
+
+def sift_and_qber(alice_bits, alice_bases, bob_bases, bob_bits):
+    """Matching-basis indices, both sifted keys and the QBER in percent"""
+    # Step 4: Find matching bases and generate sifted key if QBER ≤ 11%
+    matching_indices = []
+    sifted_alice = []
+    sifted_bob = []
+
+    for i in range(len(alice_bits)):
+        if alice_bases[i] == bob_bases[i]:
+            matching_indices.append(i)
+            sifted_alice.append(alice_bits[i])
+            sifted_bob.append(bob_bits[i])
+
+    # Step 5: QBER calculation
+    errors = sum(1 for a, b in zip(sifted_alice, sifted_bob) if a != b)
+    qber = (errors / len(sifted_alice)) * 100 if len(sifted_alice) > 0 else 0
+    return matching_indices, sifted_alice, sifted_bob, qber
+
+
+def run(n=16, seed=None):
+    """One BB84 round of `n` qubits with Eve on the even positions"""
+    from qiskit_aer import AerSimulator
+
+    # "channel" seeds the simulator's measurement outcomes
+    rng = party_generators(seed, ("alice", "bob", "eve", "channel"))
+
+    # Alice prepares random bits and bases (plain lists, as printed below)
+    alice_bits = random_bits(rng["alice"], n)
+    alice_bases = random_bits(rng["alice"], n)  # 0 = Z-basis, 1 = X-basis
+
+    # Eve measures alternate bits (0, 2, 4, ...)
+    eve_bases = [b if i % 2 == 0 else None for i, b in enumerate(random_bits(rng["eve"], n))]
+    eve_resend = random_bits(rng["eve"], n)
+
+    # Bob chooses random bases
+    bob_bases = random_bits(rng["bob"], n)
+
+    qc = build_circuit(alice_bits, alice_bases, eve_bases, bob_bases, eve_resend)
+
+    # Run the circuit once
+    sim = AerSimulator()
+    result = sim.run(qc, shots=1, seed_simulator=int(rng["channel"].integers(2 ** 31))).result()
+    bob_results = list(result.get_counts().keys())[0]
+    bob_bits = [int(b) for b in bob_results[::-1]]
+
+    matching_indices, sifted_alice, sifted_bob, qber = sift_and_qber(alice_bits, alice_bases, bob_bases, bob_bits)
+    return {"alice_bits": alice_bits, "alice_bases": alice_bases, "eve_bases": eve_bases,
+            "bob_bases": bob_bases, "bob_bits": bob_bits, "matching_indices": matching_indices,
+            "sifted_alice": sifted_alice, "sifted_bob": sifted_bob, "qber": qber}
+
+
+def main():
+    r = run()
+
+    # --- OUTPUT ---
+    print("Alice bits : ", r["alice_bits"])
+    print("Alice bases: ", r["alice_bases"])
+    print("Eve bases  : ", r["eve_bases"])
+    print("Bob bases  : ", r["bob_bases"])
+    print("Bob bits   : ", r["bob_bits"])
+
+    print(f"\nMatching bases indices: {r['matching_indices']}")
+    print(f"Number of matched bases: {len(r['matching_indices'])}")
+    print(f"Error rate (QBER): {r['qber']:.2f}%")
+
+    if r["qber"] > SECURITY_THRESHOLD:
+        print("🚨 Eve detected! Communication aborted — no sifted key generated.")
+    else:
+        print("✅ Communication secure (QBER ≤ 11%).")
+        print("Sifted Alice key:", r["sifted_alice"])
+        print("Sifted Bob key  :", r["sifted_bob"])
 
-SECURITY_THRESHOLD = 11
 
-# --- OUTPUT ---
-print("Alice bits : ", alice_bits)
-print("Alice bases: ", alice_bases)
-print("Eve bases  : ", eve_bases)
-print("Bob bases  : ", bob_bases)
-print("Bob bits   : ", bob_bits)
-
-print(f"\nMatching bases indices: {matching_indices}")
-print(f"Number of matched bases: {len(matching_indices)}")
-print(f"Error rate (QBER): {qber:.2f}%")
-
-if qber > SECURITY_THRESHOLD:
-    print("🚨 Eve detected! Communication aborted — no sifted key generated.")
-else:
-    print("✅ Communication secure (QBER ≤ 11%).")
-    print("Sifted Alice key:", sifted_alice)
-    print("Sifted Bob key  :", sifted_bob)
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import os
+
+# qiskit, qiskit_aer and qiskit_ibm_runtime take seconds to import, so they are
+# only imported inside the functions that need them.
+
+TOKEN_ENV = "QISKIT_IBM_TOKEN"
+CHANNEL_ENV = "QISKIT_IBM_CHANNEL"
+INSTANCE_ENV = "QISKIT_IBM_INSTANCE"
+
+
+# -------------------------
+# Circuit
+# -------------------------
+def prepare_alice(qc, abits, abase):
+    """Encode Alice's bits: |0>, |1>, |+> or |-> depending on bit and basis"""
+    for n in range(len(abits)):
+        if abits[n] == 0:
+            if abase[n] == 1:   # |+>
+                qc.h(n)
+        if abits[n] == 1:
+            if abase[n] == 0:   # |1>
+                qc.x(n)
+            if abase[n] == 1:   # |->
+                qc.x(n)
+                qc.h(n)
+
+
+def measure_bob(qc, bbase):
+    """Bob measures each qubit, applying H first when he picked the X basis"""
+    for m in range(len(bbase)):
+        if bbase[m] == 1:
+            qc.h(m)
+        qc.measure(m, m)
+
+
+def intercept(qc, ebase):
+    """Eve measures and resends in her basis; -1 (or None) leaves a qubit alone
+
+    Measuring collapses the qubit onto Eve's basis state, so undoing her H
+    afterwards is the same as re-preparing what she saw. Her result lands in
+    the qubit's own clbit and is overwritten by Bob's measurement.
+    """
+    for i in range(len(ebase)):
+        if ebase[i] is None or ebase[i] < 0:
+            continue
+        if ebase[i] == 1:
+            qc.h(i)
+        qc.measure(i, i)
+        if ebase[i] == 1:
+            qc.h(i)
+
+
+def build_circuit(abits, abase, bbase, ebase=None):
+    from qiskit import QuantumCircuit
+
+    bit_num = len(abits)
+    qc = QuantumCircuit(bit_num, bit_num)
+    prepare_alice(qc, abits, abase)
+    qc.barrier()
+    if ebase is not None:
+        intercept(qc, ebase)
+        qc.barrier()
+    measure_bob(qc, bbase)
+    return qc
+
+
+# -------------------------
+# Simulation and sifting
+# -------------------------
+def counts_to_bits(counts):
+    """Bob's bits from a one-shot counts dict (reversed for little-endian)"""
+    measured_str = list(counts.keys())[0]
+    return [int(bit) for bit in measured_str[::-1]]
+
+
+def run_aer(qc, noise_model=None, transpile_first=True):
+    """Run the circuit once on AerSimulator and return Bob's bits"""
+    from qiskit import transpile
+    from qiskit_aer import AerSimulator
+
+    sim = AerSimulator(noise_model=noise_model) if noise_model is not None else AerSimulator()
+    tqc = transpile(qc, sim) if transpile_first else qc
+    result = sim.run(tqc, shots=1).result()
+    return counts_to_bits(result.get_counts())
+
+
+def sift(abits, abase, bbase, bob_bits):
+    """Keep only the positions where Alice's and Bob's bases match"""
+    sifted_alice = []
+    sifted_bob = []
+    for i in range(len(abits)):
+        if abase[i] == bbase[i]:
+            sifted_alice.append(int(abits[i]))
+            sifted_bob.append(int(bob_bits[i]))
+    return sifted_alice, sifted_bob
+
+
+# -------------------------
+# IBM Quantum
+# -------------------------
+def runtime_service():
+    """QiskitRuntimeService using credentials from the environment
+
+    Reads QISKIT_IBM_TOKEN (required), QISKIT_IBM_CHANNEL (default ibm_cloud)
+    and QISKIT_IBM_INSTANCE (optional). Returns None when no token is set.
+    """
+    token = os.environ.get(TOKEN_ENV)
+    if not token:
+        return None
+    from qiskit_ibm_runtime import QiskitRuntimeService
+
+    kwargs = {"channel": os.environ.get(CHANNEL_ENV, "ibm_cloud"), "token": token}
+    if os.environ.get(INSTANCE_ENV):
+        kwargs["instance"] = os.environ[INSTANCE_ENV]
+    return QiskitRuntimeService(**kwargs)
+
+
+def runtime_backend(service, preferred="ibm_brisbane", fallback="ibmq_qasm_simulator"):
+    # Try using a real backend (if you have access), else fallback to simulator
+    try:
+        return service.backend(preferred)
+    except Exception:
+        return service.backend(fallback)
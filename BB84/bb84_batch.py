@@ -0,0 +1,374 @@
+"""Run BB84 sessions of any length from the command line.
+
+    python BB84/bb84_batch.py --key-length 100000 --backend numpy --workers 8
+    python BB84/bb84_batch.py --key-length 4096 --backend aer-noisy --noise 0.02 --eve 0.25
+    python BB84/bb84_batch.py --key-length 256 --backend runtime --batch-size 512
+    python BB84/bb84_batch.py --key-length 256 --backend runtime --run-id bb84-3f2a9c0e71d4   # resume
+
+Qubits are sent in batches of --batch-size; each batch is an independent
+unit of work for a worker process, seeded from one SeedSequence so a run is
+reproducible for a given --seed whatever the number of workers. The key is
+written as packed bits (np.packbits, MSB first) with a JSON stats sidecar.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from bb84 import build_circuit, counts_to_bits
+from randomness import PARTIES, party_generators, random_bits
+
+LOCAL_BACKENDS = ["numpy", "aer", "aer-noisy"]
+# Submitted through runtime_jobs; runtime-fake runs the same path offline on Aer
+RUNTIME_BACKENDS = ["runtime", "runtime-fake"]
+BACKENDS = LOCAL_BACKENDS + RUNTIME_BACKENDS
+# Qubits per circuit for the circuit backends; BB84 qubits never interact, so
+# a batch is split into many narrow circuits run in a single call.
+CIRCUIT_WIDTH = 32
+SECURITY_THRESHOLD = 0.11
+SIFT_RATE = 0.5   # expected fraction of qubits whose bases match
+
+
+# --- One batch ---
+def _measure_numpy(abits, abase, bbase, ebase, rng):
+    """Ideal intercept-resend BB84 without circuits: Bob's raw bits"""
+    n = len(abits)
+    eve = ebase >= 0
+    # What Eve sees: Alice's bit if she guessed the basis, a coin flip otherwise
+    eve_bits = np.where(ebase == abase, abits, random_bits(rng, n))
+    bits = np.where(eve, eve_bits, abits)
+    basis = np.where(eve, ebase, abase)
+    return np.where(bbase == basis, bits, random_bits(rng, n)).astype(np.uint8)
+
+
+def noise_model(p):
+    """Depolarizing error `p` on every 1-qubit gate plus a symmetric readout error `p`"""
+    from qiskit_aer.noise import NoiseModel, ReadoutError, depolarizing_error
+
+    model = NoiseModel()
+    model.add_all_qubit_quantum_error(depolarizing_error(p, 1), ["h", "x"])
+    model.add_all_qubit_readout_error(ReadoutError([[1 - p, p], [p, 1 - p]]))
+    return model
+
+
+def _circuits(abits, abase, bbase, ebase):
+    return [build_circuit(abits[i:i + CIRCUIT_WIDTH], abase[i:i + CIRCUIT_WIDTH],
+                          bbase[i:i + CIRCUIT_WIDTH], ebase[i:i + CIRCUIT_WIDTH])
+            for i in range(0, len(abits), CIRCUIT_WIDTH)]
+
+
+def _measure_aer(abits, abase, bbase, ebase, seed, noise=None):
+    from qiskit_aer import AerSimulator
+
+    # H, X, measure and Pauli noise are all Clifford: the stabilizer method
+    # stays fast however wide the circuits are
+    sim = AerSimulator(method="stabilizer", noise_model=noise_model(noise) if noise else None)
+    result = sim.run(_circuits(abits, abase, bbase, ebase), shots=1, seed_simulator=seed).result()
+    return np.concatenate([counts_to_bits(result.get_counts(i)) for i in range(len(result.results))]).astype(np.uint8)
+
+
+def batch_seed(entropy, index):
+    """SeedSequence of batch `index`; spawn key 0 is kept for the QBER sample"""
+    return np.random.SeedSequence(entropy, spawn_key=(index + 1,))
+
+
+def prepare_batch(qubits, seed_seq, eve=0.0):
+    """Alice's bits and bases, Bob's bases and Eve's bases (-1 where she lets the qubit through)
+
+    Also returns the "channel" generator that decides measurement outcomes.
+    """
+    rng = party_generators(seed_seq, PARTIES + ("channel",))
+    abits = random_bits(rng["alice"], qubits)
+    abase = random_bits(rng["alice"], qubits)
+    bbase = random_bits(rng["bob"], qubits)
+    ebase = np.where(rng["eve"].random(qubits) < eve, random_bits(rng["eve"], qubits), -1).astype(np.int8)
+    return abits, abase, bbase, ebase, rng["channel"]
+
+
+def sift_batch(abits, abase, bbase, ebase, bob_bits):
+    """(sifted Alice bits, sifted Bob bits, Eve-intercepted count)"""
+    keep = abase == bbase
+    return abits[keep], np.asarray(bob_bits, dtype=np.uint8)[keep], int((ebase >= 0).sum())
+
+
+def run_batch(qubits, seed_seq, backend="numpy", eve=0.0, noise=0.01):
+    """Send `qubits` qubits on a local backend and sift them
+
+    Returns (sifted Alice bits, sifted Bob bits, Eve-intercepted count), the
+    bits as uint8 arrays.
+    """
+    abits, abase, bbase, ebase, rng = prepare_batch(qubits, seed_seq, eve)
+    if backend == "numpy":
+        bob_bits = _measure_numpy(abits, abase, bbase, ebase, rng)
+    elif backend in ("aer", "aer-noisy"):
+        seed = int(rng.integers(2 ** 31))
+        bob_bits = _measure_aer(abits, abase, bbase, ebase, seed, noise if backend == "aer-noisy" else None)
+    else:
+        raise ValueError(f"unknown local backend {backend!r}; expected one of {LOCAL_BACKENDS}")
+    return sift_batch(abits, abase, bbase, ebase, bob_bits)
+
+
+def _batch_job(job):
+    return run_batch(*job)
+
+
+# --- Session ---
+def _sifted_target(key_length, key, sample):
+    if key == "sifted":
+        return key_length
+    return math.ceil(key_length / (1 - sample))
+
+
+def new_run_id():
+    return f"bb84-{uuid.uuid4().hex[:12]}"
+
+
+def _run_runtime(backend, batch_size, eve, target, entropy, store_path, run_id, poll, collect, contiguous_bits):
+    from runtime_jobs import JobManager, JobStore, make_client
+
+    client = make_client(backend)
+    store = JobStore(store_path)
+    manager = JobManager(client, store, run_id, poll_interval=poll)
+    inputs = {}
+
+    def circuits_for(index):
+        inputs[index] = prepare_batch(batch_size, batch_seed(entropy, index), eve)[:4]
+        return _circuits(*inputs[index])
+
+    def on_result(index, bits):
+        if index not in inputs:
+            inputs[index] = prepare_batch(batch_size, batch_seed(entropy, index), eve)[:4]
+        collect(index, sift_batch(*inputs.pop(index), bits))
+
+    try:
+        planned = 0
+        while contiguous_bits() < target:
+            more = math.ceil((target - contiguous_bits()) / (batch_size * SIFT_RATE))
+            asyncio.run(manager.run(range(planned, planned + more), circuits_for, on_result))
+            planned += more
+    finally:
+        client.close()
+        store.close()
+    return client.name, manager.resumed
+
+
+def run_session(key_length, backend="numpy", batch_size=4096, workers=None, eve=0.0, seed=None,
+                key="final", sample=0.1, noise=0.01, progress=None, store="bb84_jobs.sqlite", run_id=None,
+                poll=5.0):
+    """Send qubits until `key_length` key bits are available
+
+    key="sifted" returns the raw sifted key. key="final" also sifts enough
+    extra bits to disclose a random `sample` fraction for the QBER estimate,
+    drops them, and returns no key when the estimate is above 11%.
+    `progress(stats)` is called after every batch.
+
+    Runtime backends record every job in the SQLite file `store` under
+    `run_id`; passing the id of an interrupted run resumes it with its
+    original seed, batch size and Eve fraction.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown backend {backend!r}; expected one of {BACKENDS}")
+    if not 0 <= eve <= 1:
+        raise ValueError("eavesdropper fraction must be between 0 and 1")
+    if key not in ("sifted", "final"):
+        raise ValueError("key must be 'sifted' or 'final'")
+    if key == "final" and not 0 < sample < 1:
+        raise ValueError("sample fraction must be between 0 and 1")
+
+    entropy = np.random.SeedSequence(seed).entropy
+    if backend in RUNTIME_BACKENDS:
+        from runtime_jobs import JobStore
+
+        run_id = run_id or new_run_id()
+        params = {"backend": backend, "batch_size": batch_size, "eve": eve, "seed": entropy}
+        job_store = JobStore(store)
+        params = job_store.open_run(run_id, params)
+        job_store.close()
+        if params["backend"] != backend:
+            raise ValueError(f"run {run_id} used the {params['backend']} backend")
+        batch_size, eve, entropy = params["batch_size"], params["eve"], params["seed"]
+
+    target = _sifted_target(key_length, key, sample)
+    stats = {"backend": backend, "key": key, "key_length": key_length, "batch_size": batch_size,
+             "eve_fraction": eve, "noise": noise if backend == "aer-noisy" else 0.0, "seed": entropy,
+             "qubits_sent": 0, "intercepted": 0, "sifted_bits": 0, "batches": 0}
+    results = {}
+    start = time.perf_counter()
+
+    def collect(index, result):
+        results[index] = result
+        stats["qubits_sent"] += batch_size
+        stats["intercepted"] += result[2]
+        stats["sifted_bits"] += len(result[0])
+        stats["batches"] += 1
+        stats["elapsed"] = time.perf_counter() - start
+        if progress:
+            progress(dict(stats, target=target))
+
+    def contiguous_bits():
+        # Only a gap-free prefix of batches counts, so the key does not depend
+        # on which worker finished first
+        total, i = 0, 0
+        while i in results:
+            total += len(results[i][0])
+            i += 1
+        return total
+
+    if backend in RUNTIME_BACKENDS:
+        stats["run_id"] = run_id
+        stats["device"], stats["resumed_batches"] = _run_runtime(
+            backend, batch_size, eve, target, entropy, store, run_id, poll, collect, contiguous_bits)
+    else:
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Keep every worker busy, but stop submitting once the batches
+            # already queued should cover the target
+            in_flight = {}
+            index = 0
+            max_in_flight = 2 * workers
+            while contiguous_bits() < target:
+                pending_bits = len(in_flight) * batch_size * SIFT_RATE
+                while len(in_flight) < max_in_flight and stats["sifted_bits"] + pending_bits < target:
+                    job = (batch_size, batch_seed(entropy, index), backend, eve, noise)
+                    in_flight[pool.submit(_batch_job, job)] = index
+                    index += 1
+                    pending_bits += batch_size * SIFT_RATE
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(in_flight.pop(future), future.result())
+            for future in in_flight:
+                future.cancel()
+
+    alice = np.concatenate([results[i][0] for i in sorted(results)])[:target]
+    bob = np.concatenate([results[i][1] for i in sorted(results)])[:target]
+    errors = int((alice != bob).sum())
+    stats["elapsed"] = time.perf_counter() - start
+    stats["sifted_used"] = len(alice)
+    stats["qber"] = errors / len(alice) if len(alice) else 0.0
+
+    if key == "sifted":
+        final = alice
+        stats["mismatched_bits"] = errors
+    else:
+        check = np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=(0,))).permutation(len(alice))
+        disclosed, kept = check[:len(alice) - key_length], np.sort(check[len(alice) - key_length:])
+        stats["sample_bits"] = len(disclosed)
+        stats["qber_estimate"] = float((alice[disclosed] != bob[disclosed]).mean()) if len(disclosed) else 0.0
+        stats["mismatched_bits"] = int((alice[kept] != bob[kept]).sum())
+        final = alice[kept]
+        if stats["qber_estimate"] > SECURITY_THRESHOLD:
+            final = np.zeros(0, dtype=np.uint8)
+            stats["aborted"] = True
+
+    stats["key_bits"] = len(final)
+    stats["key_rate_bps"] = len(final) / stats["elapsed"] if stats["elapsed"] else 0.0
+    return final, stats
+
+
+# --- Output ---
+def write_key(path, bits, stats):
+    """Packed key bits to `path`, stats to `path`.json"""
+    with open(path, "wb") as f:
+        f.write(np.packbits(bits).tobytes())
+    with open(path + ".json", "w") as f:
+        json.dump(stats, f, indent=2, default=str)
+
+
+def read_key(path):
+    """Key bits written by write_key (the sidecar says how many are real)"""
+    with open(path + ".json") as f:
+        stats = json.load(f)
+    with open(path, "rb") as f:
+        packed = np.frombuffer(f.read(), dtype=np.uint8)
+    return np.unpackbits(packed)[:stats["key_bits"]], stats
+
+
+class ProgressLine:
+    """Single-line progress bar with the live sifted-key rate, redrawn in place on stderr"""
+
+    def __init__(self, stream=sys.stderr, width=30, interval=0.1):
+        self.stream = stream
+        self.width = width
+        self.interval = interval
+        self.last = 0.0
+
+    def __call__(self, stats):
+        now = time.perf_counter()
+        if now - self.last < self.interval and stats["sifted_bits"] < stats["target"]:
+            return
+        self.last = now
+        done = min(1.0, stats["sifted_bits"] / stats["target"])
+        bar = "#" * int(done * self.width)
+        rate = stats["sifted_bits"] / stats["elapsed"] if stats["elapsed"] else 0.0
+        self.stream.write(f"\r[{bar:<{self.width}}] {done:>4.0%}  {stats['sifted_bits']}/{stats['target']} sifted  "
+                          f"{stats['qubits_sent']} qubits  {_rate(rate)}  {stats['elapsed']:.1f}s ")
+        self.stream.flush()
+
+    def close(self):
+        if self.last:
+            self.stream.write("\n")
+
+
+def _rate(bps):
+    for unit, scale in (("Mbit/s", 1e6), ("kbit/s", 1e3)):
+        if bps >= scale:
+            return f"{bps / scale:.2f} {unit}"
+    return f"{bps:.1f} bit/s"
+
+
+# --- CLI ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate BB84 keys in batches across a process pool")
+    parser.add_argument("--key-length", type=int, default=1024, help="key bits to produce")
+    parser.add_argument("--backend", choices=BACKENDS, default="numpy")
+    parser.add_argument("--batch-size", type=int, default=4096, help="qubits per batch")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (not used for runtime)")
+    parser.add_argument("--eve", type=float, default=0.0, help="fraction of qubits Eve intercepts and resends")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--key", choices=["sifted", "final"], default="final",
+                        help="raw sifted key, or final key after disclosing a QBER sample")
+    parser.add_argument("--sample", type=float, default=0.1, help="fraction of sifted bits disclosed for the QBER")
+    parser.add_argument("--noise", type=float, default=0.01, help="gate and readout error for aer-noisy")
+    parser.add_argument("--output", default="bb84_key.bin")
+    parser.add_argument("--store", default="bb84_jobs.sqlite", help="SQLite job record for the runtime backends")
+    parser.add_argument("--run-id", default=None, help="resume this runtime run (printed when a run starts)")
+    parser.add_argument("--poll", type=float, default=5.0, help="seconds between runtime job status checks")
+    parser.add_argument("--quiet", action="store_true", help="no progress line")
+    args = parser.parse_args(argv)
+    if args.key_length < 1 or args.batch_size < 1:
+        parser.error("--key-length and --batch-size must be positive")
+
+    if args.backend in RUNTIME_BACKENDS and args.run_id is None:
+        args.run_id = new_run_id()
+        print(f"Run id {args.run_id}; pass --run-id {args.run_id} to resume if interrupted", file=sys.stderr)
+    progress = None if args.quiet else ProgressLine()
+    try:
+        key, stats = run_session(args.key_length, args.backend, args.batch_size, args.workers, args.eve,
+                                 args.seed, args.key, args.sample, args.noise, progress, args.store, args.run_id,
+                                 args.poll)
+    except (ValueError, RuntimeError) as e:
+        parser.error(str(e))
+    finally:
+        if progress:
+            progress.close()
+    write_key(args.output, key, stats)
+
+    qber = stats.get("qber_estimate", stats["qber"])
+    print(f"{stats['qubits_sent']} qubits sent, {stats['sifted_used']} sifted bits used, QBER {qber:.2%}")
+    if stats.get("aborted"):
+        print(f"QBER above {SECURITY_THRESHOLD:.0%}: eavesdropper suspected, key discarded")
+        return 1
+    print(f"Wrote {stats['key_bits']} key bits to {args.output} ({_rate(stats['key_rate_bps'])}), "
+          f"stats in {args.output}.json")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,40 +1,45 @@
 import numpy as np
 
-# Shared secret key from BB84
-shared_key = [1, 0, 0]
 
-# Convert key to numpy array
-key = np.array(shared_key)
+def main():
+    # Shared secret key from BB84
+    shared_key = [1, 0, 0]
 
-# -------------------------------
-# Message (as bits)
-# Let's send "HI" (ASCII)
-# -------------------------------
-message = "HI"
-msg_bits = ''.join(format(ord(c), '08b') for c in message)  # binary string
-msg_bits = np.array([int(b) for b in msg_bits])
+    # Convert key to numpy array
+    key = np.array(shared_key)
 
-print("Original message: ", message)
-print("Message bits:     ", msg_bits)
+    # -------------------------------
+    # Message (as bits)
+    # Let's send "HI" (ASCII)
+    # -------------------------------
+    message = "HI"
+    msg_bits = ''.join(format(ord(c), '08b') for c in message)  # binary string
+    msg_bits = np.array([int(b) for b in msg_bits])
 
-# -------------------------------
-# Encryption with One-Time Pad
-# -------------------------------
-# Repeat key if message is longer
-key_repeated = np.resize(key, msg_bits.shape)
+    print("Original message: ", message)
+    print("Message bits:     ", msg_bits)
 
-cipher_bits = np.bitwise_xor(msg_bits, key_repeated)
-print("Cipher bits:      ", cipher_bits)
+    # -------------------------------
+    # Encryption with One-Time Pad
+    # -------------------------------
+    # Repeat key if message is longer
+    key_repeated = np.resize(key, msg_bits.shape)
 
-# -------------------------------
-# Decryption with One-Time Pad
-# -------------------------------
-decrypted_bits = np.bitwise_xor(cipher_bits, key_repeated)
+    cipher_bits = np.bitwise_xor(msg_bits, key_repeated)
+    print("Cipher bits:      ", cipher_bits)
 
-# Convert bits back to text
-decrypted_str = ''.join(chr(int(''.join(map(str,decrypted_bits[i:i+8])), 2)) 
-                        for i in range(0, len(decrypted_bits), 8))
+    # -------------------------------
+    # Decryption with One-Time Pad
+    # -------------------------------
+    decrypted_bits = np.bitwise_xor(cipher_bits, key_repeated)
 
-print("Decrypted bits:   ", decrypted_bits)
-print("Decrypted text:   ", decrypted_str)
+    # Convert bits back to text
+    decrypted_str = ''.join(chr(int(''.join(map(str,decrypted_bits[i:i+8])), 2)) 
+                            for i in range(0, len(decrypted_bits), 8))
 
+    print("Decrypted bits:   ", decrypted_bits)
+    print("Decrypted text:   ", decrypted_str)
+
+
+if __name__ == "__main__":
+    main()
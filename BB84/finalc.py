@@ -21,32 +21,37 @@ def otp_decrypt(cipher_bits, key_repeated):
     """Decrypt cipher using One-Time Pad"""
     return np.bitwise_xor(cipher_bits, key_repeated)
 
-# -------------------------------
-# Example: Secure message
-# -------------------------------
-message = "hello"
-print("Original message: ", message)
+def main():
+    # -------------------------------
+    # Example: Secure message
+    # -------------------------------
+    message = "hello"
+    print("Original message: ", message)
+
+    # Convert text → bits
+    msg_bits = text_to_bits(message)
+    print("Message bits:     ", msg_bits)
+
+    # Show ASCII values
+    ascii_vals = [ord(c) for c in message]
+    print("ASCII values:     ", ascii_vals)
 
-# Convert text → bits
-msg_bits = text_to_bits(message)
-print("Message bits:     ", msg_bits)
+    # Shared key (from BB84)
+    shared_key = [1, 0, 0]   # Demo key
+    key = np.array(shared_key)
 
-# Show ASCII values
-ascii_vals = [ord(c) for c in message]
-print("ASCII values:     ", ascii_vals)
+    # Encrypt
+    cipher_bits, key_repeated = otp_encrypt(msg_bits, key)
+    print("Key (repeated):   ", key_repeated)
+    print("Cipher bits:      ", cipher_bits)
 
-# Shared key (from BB84)
-shared_key = [1, 0, 0]   # Demo key
-key = np.array(shared_key)
+    # Decrypt
+    decrypted_bits = otp_decrypt(cipher_bits, key_repeated)
+    decrypted_text = bits_to_text(decrypted_bits)
 
-# Encrypt
-cipher_bits, key_repeated = otp_encrypt(msg_bits, key)
-print("Key (repeated):   ", key_repeated)
-print("Cipher bits:      ", cipher_bits)
+    print("Decrypted bits:   ", decrypted_bits)
+    print("Decrypted text:   ", decrypted_text)
 
-# Decrypt
-decrypted_bits = otp_decrypt(cipher_bits, key_repeated)
-decrypted_text = bits_to_text(decrypted_bits)
 
-print("Decrypted bits:   ", decrypted_bits)
-print("Decrypted text:   ", decrypted_text)
+if __name__ == "__main__":
+    main()
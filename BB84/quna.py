@@ -1,72 +1,54 @@
 import numpy as np
-from qiskit import QuantumCircuit
-from qiskit_aer import AerSimulator
 
-# -------------------------
-# Step 1: Alice prepares qubits
-# -------------------------
-rng = np.random.default_rng()
-bit_num = 20
-
-qc = QuantumCircuit(bit_num, bit_num)
-
-# Alice's random bits and bases
-abits = np.round(rng.random(bit_num)).astype(int)   # 0 or 1
-abase = np.round(rng.random(bit_num)).astype(int)   # 0=Z basis, 1=X basis
-
-# Prepare Alice's states
-for n in range(bit_num):
-    if abits[n] == 0:
-        if abase[n] == 1:   # |+>
-            qc.h(n)
-    if abits[n] == 1:
-        if abase[n] == 0:   # |1>
-            qc.x(n)
-        if abase[n] == 1:   # |->
-            qc.x(n)
-            qc.h(n)
-
-qc.barrier()
-
-# -------------------------
-# Step 2: Bob chooses bases and measures
-# -------------------------
-bbase = np.round(rng.random(bit_num)).astype(int)
-
-for m in range(bit_num):
-    if bbase[m] == 1:   # X basis → apply H before measure
-        qc.h(m)
-    qc.measure(m, m)
-
-# -------------------------
-# Step 3: Run simulation
-# -------------------------
-sim = AerSimulator()
-result = sim.run(qc).result()
-counts = result.get_counts()
-
-# Simulator outputs counts of all possible bitstrings,
-# we only need one sample since this is a projective measurement
-bob_raw = list(counts.keys())[0]
-bob_raw = bob_raw[::-1]   # reverse bit order
-bob_bits = np.array([int(b) for b in bob_raw])
-
-# -------------------------
-# Step 4: Sifting - keep only same bases
-# -------------------------
-sifted_alice = []
-sifted_bob = []
-for i in range(bit_num):
-    if abase[i] == bbase[i]:   # keep only if bases match
-        sifted_alice.append(abits[i])
-        sifted_bob.append(bob_bits[i])
-
-# -------------------------
-# Display results
-# -------------------------
-print("Alice bits:  ", abits)
-print("Alice bases: ", abase)
-print("Bob bases:   ", bbase)
-print("Bob bits:    ", bob_bits)
-print("\nSifted Alice key:", sifted_alice)
-print("Sifted Bob key:  ", sifted_bob)
+from bb84 import build_circuit, run_aer, sift
+from randomness import party_generators, random_bits
+
+
+def run(bit_num=20, seed=None):
+    """One BB84 round on AerSimulator; returns everything the demo prints"""
+    # -------------------------
+    # Step 1: Alice prepares qubits
+    # -------------------------
+    rng = party_generators(seed)
+
+    # Alice's random bits and bases
+    abits = random_bits(rng["alice"], bit_num)   # 0 or 1
+    abase = random_bits(rng["alice"], bit_num)   # 0=Z basis, 1=X basis
+
+    # -------------------------
+    # Step 2: Bob chooses bases and measures
+    # -------------------------
+    bbase = random_bits(rng["bob"], bit_num)
+    qc = build_circuit(abits, abase, bbase)
+
+    # -------------------------
+    # Step 3: Run simulation
+    # -------------------------
+    # Simulator outputs counts of all possible bitstrings,
+    # we only need one sample since this is a projective measurement
+    bob_bits = np.array(run_aer(qc, transpile_first=False))
+
+    # -------------------------
+    # Step 4: Sifting - keep only same bases
+    # -------------------------
+    sifted_alice, sifted_bob = sift(abits, abase, bbase, bob_bits)
+    return {"abits": abits, "abase": abase, "bbase": bbase, "bob_bits": bob_bits,
+            "sifted_alice": sifted_alice, "sifted_bob": sifted_bob}
+
+
+def main():
+    r = run()
+
+    # -------------------------
+    # Display results
+    # -------------------------
+    print("Alice bits:  ", r["abits"])
+    print("Alice bases: ", r["abase"])
+    print("Bob bases:   ", r["bbase"])
+    print("Bob bits:    ", r["bob_bits"])
+    print("\nSifted Alice key:", r["sifted_alice"])
+    print("Sifted Bob key:  ", r["sifted_bob"])
+
+
+if __name__ == "__main__":
+    main()
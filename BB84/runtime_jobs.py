@@ -0,0 +1,279 @@
+"""Submit BB84 batches to IBM Quantum Runtime and survive interruptions.
+
+Each batch of circuits becomes one Sampler job. Job ids and results are
+written to a SQLite file as they happen, so re-running with the same run id
+polls the jobs still in flight, reuses finished results and only submits
+what is missing. RuntimeClient hides the service; FakeRuntimeClient runs the
+same flow offline on BackendSamplerV2 over AerSimulator.
+"""
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+
+from bb84 import TOKEN_ENV, counts_to_bits, runtime_backend, runtime_service
+
+DONE = "DONE"
+FAILED = ("ERROR", "CANCELLED")
+POLL_INTERVAL = 5.0
+MAX_IN_FLIGHT = 8
+RETRIES = 2
+
+
+def _status_name(status):
+    # qiskit_ibm_runtime returns strings, qiskit primitives return JobStatus enums
+    return getattr(status, "name", status).upper()
+
+
+def _pub_bits(result):
+    """Bob's bits from one shot of each circuit, concatenated in circuit order"""
+    bits = []
+    for pub in result:
+        bits.extend(counts_to_bits(pub.data.c.get_counts()))
+    return bits
+
+
+# --- Clients ---
+class RuntimeClient:
+    """Sampler jobs on an IBM backend, all submitted inside one Runtime batch"""
+
+    def __init__(self, service, backend):
+        self.service = service
+        self.backend = backend
+        self.name = backend.name
+        self.batch = None
+        # JobManager submits from several threads at once; only one may open the Batch
+        self.lock = threading.Lock()
+        self.jobs = {}
+
+    @classmethod
+    def from_env(cls):
+        service = runtime_service()
+        if service is None:
+            raise RuntimeError(f"set {TOKEN_ENV} to use the runtime backend")
+        return cls(service, runtime_backend(service))
+
+    def submit(self, circuits, shots=1):
+        from qiskit.transpiler.preset_passmanagers import generate_preset_pass_manager
+        from qiskit_ibm_runtime import Batch, SamplerV2
+
+        with self.lock:
+            if self.batch is None:
+                # Batch mode lets the jobs of one run queue together without holding the device
+                self.batch = Batch(backend=self.backend)
+            batch = self.batch
+        pm = generate_preset_pass_manager(target=self.backend.target, optimization_level=1)
+        job = SamplerV2(mode=batch).run(pm.run(circuits), shots=shots)
+        self.jobs[job.job_id()] = job
+        return job.job_id()
+
+    def _job(self, job_id):
+        job = self.jobs.get(job_id)
+        if job is None:
+            try:
+                job = self.jobs[job_id] = self.service.job(job_id)
+            except Exception as e:
+                raise KeyError(job_id) from e
+        return job
+
+    def status(self, job_id):
+        return _status_name(self._job(job_id).status())
+
+    def result(self, job_id):
+        return _pub_bits(self._job(job_id).result())
+
+    def close(self):
+        with self.lock:
+            batch, self.batch = self.batch, None
+        if batch is not None:
+            batch.close()
+
+
+class FakeRuntimeClient:
+    """Offline stand-in: BackendSamplerV2 over AerSimulator, with an optional queue delay
+
+    Jobs live in memory only, so after a restart every unfinished job id is
+    unknown and the manager resubmits it, as it would for an expired job.
+    """
+
+    def __init__(self, simulator=None, latency=0.0, seed=None):
+        self.simulator = simulator
+        self.latency = latency
+        self.seed = seed
+        self.name = "fake_runtime"
+        self.jobs = {}   # job id -> (ready time, primitive job)
+
+    def submit(self, circuits, shots=1):
+        from qiskit.primitives import BackendSamplerV2
+        from qiskit_aer import AerSimulator
+
+        if self.simulator is None:
+            options = {} if self.seed is None else {"seed_simulator": self.seed}
+            self.simulator = AerSimulator(method="stabilizer", **options)
+        job = BackendSamplerV2(backend=self.simulator).run(circuits, shots=shots)
+        job_id = f"fake-{uuid.uuid4().hex}"
+        self.jobs[job_id] = (time.monotonic() + self.latency, job)
+        return job_id
+
+    def status(self, job_id):
+        ready, job = self.jobs[job_id]
+        if time.monotonic() < ready:
+            return "QUEUED"
+        return _status_name(job.status())
+
+    def result(self, job_id):
+        return _pub_bits(self.jobs[job_id][1].result())
+
+    def close(self):
+        pass
+
+
+def make_client(backend):
+    """Client for a bb84_batch backend name: "runtime" or "runtime-fake" """
+    if backend == "runtime-fake":
+        return FakeRuntimeClient()
+    return RuntimeClient.from_env()
+
+
+# --- Persistence ---
+class JobStore:
+    """SQLite record of runs (their parameters) and of every batch's job id and result"""
+
+    def __init__(self, path):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY,
+                params TEXT NOT NULL,
+                created REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS jobs (
+                run_id TEXT NOT NULL,
+                batch INTEGER NOT NULL,
+                job_id TEXT,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                submitted REAL,
+                finished REAL,
+                result TEXT,
+                error TEXT,
+                PRIMARY KEY (run_id, batch)
+            );
+        """)
+
+    def open_run(self, run_id, params):
+        """Parameters of `run_id`, creating the run with `params` if it is new"""
+        row = self.db.execute("SELECT params FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        if row is not None:
+            return json.loads(row[0])
+        with self.db:
+            self.db.execute("INSERT INTO runs VALUES (?, ?, ?)", (run_id, json.dumps(params), time.time()))
+        return params
+
+    def jobs(self, run_id):
+        """batch -> {"job_id", "status", "attempts", "result"} for every batch of the run"""
+        rows = self.db.execute("SELECT batch, job_id, status, attempts, result FROM jobs WHERE run_id = ?", (run_id,))
+        return {batch: {"job_id": job_id, "status": status, "attempts": attempts, "result": result}
+                for batch, job_id, status, attempts, result in rows}
+
+    def record_submit(self, run_id, batch, job_id):
+        with self.db:
+            self.db.execute("""
+                INSERT INTO jobs (run_id, batch, job_id, status, attempts, submitted) VALUES (?, ?, ?, 'SUBMITTED', 1, ?)
+                ON CONFLICT (run_id, batch) DO UPDATE SET
+                    job_id = excluded.job_id, status = 'SUBMITTED', attempts = attempts + 1,
+                    submitted = excluded.submitted, error = NULL
+            """, (run_id, batch, job_id, time.time()))
+
+    def record_result(self, run_id, batch, bits):
+        with self.db:
+            self.db.execute("UPDATE jobs SET status = ?, result = ?, finished = ? WHERE run_id = ? AND batch = ?",
+                            (DONE, ''.join(map(str, bits)), time.time(), run_id, batch))
+
+    def record_error(self, run_id, batch, status, error):
+        with self.db:
+            self.db.execute("UPDATE jobs SET status = ?, error = ?, finished = ? WHERE run_id = ? AND batch = ?",
+                            (status, error, time.time(), run_id, batch))
+
+    def close(self):
+        self.db.close()
+
+
+# --- Manager ---
+class JobManager:
+    """Keeps up to `max_in_flight` jobs queued for one run and polls them from asyncio
+
+    Client calls block on the network, so they run in worker threads;
+    everything touching the store stays on the event loop thread.
+    """
+
+    def __init__(self, client, store, run_id, poll_interval=POLL_INTERVAL, max_in_flight=MAX_IN_FLIGHT,
+                 retries=RETRIES):
+        self.client = client
+        self.store = store
+        self.run_id = run_id
+        self.poll_interval = poll_interval
+        self.max_in_flight = max_in_flight
+        self.retries = retries
+        self.resumed = 0
+
+    async def _submit(self, batch, make_circuits):
+        circuits = make_circuits(batch)
+        job_id = await asyncio.to_thread(self.client.submit, circuits)
+        self.store.record_submit(self.run_id, batch, job_id)
+        return job_id
+
+    async def _wait(self, batch, job_id, make_circuits, attempts):
+        """Poll one job until it finishes; resubmits lost or failed jobs up to `retries` times"""
+        while True:
+            try:
+                status = await asyncio.to_thread(self.client.status, job_id)
+            except KeyError:
+                status = "LOST"
+            if status == DONE:
+                bits = await asyncio.to_thread(self.client.result, job_id)
+                self.store.record_result(self.run_id, batch, bits)
+                return bits
+            if status in FAILED or status == "LOST":
+                self.store.record_error(self.run_id, batch, status, f"job {job_id} {status.lower()}")
+                if attempts > self.retries:
+                    raise RuntimeError(f"batch {batch} failed after {attempts} attempts (last job {job_id}: {status})")
+                job_id = await self._submit(batch, make_circuits)
+                attempts += 1
+                continue
+            await asyncio.sleep(self.poll_interval)
+
+    async def run(self, batches, make_circuits, on_result=None):
+        """Bob's bits for every batch index in `batches`
+
+        `make_circuits(batch)` builds a batch's circuits and must be
+        deterministic, since it is called again when a job is resubmitted.
+        `on_result(batch, bits)` is called as each batch completes.
+        """
+        known = self.store.jobs(self.run_id)
+        results = {}
+        slots = asyncio.Semaphore(self.max_in_flight)
+
+        async def one(batch):
+            row = known.get(batch)
+            if row is not None and row["status"] == DONE:
+                self.resumed += 1
+                bits = [int(b) for b in row["result"]]
+            else:
+                async with slots:
+                    if row is not None and row["status"] == "SUBMITTED":
+                        self.resumed += 1
+                        job_id, attempts = row["job_id"], row["attempts"]
+                    else:
+                        job_id = await self._submit(batch, make_circuits)
+                        attempts = (row["attempts"] if row else 0) + 1
+                    bits = await self._wait(batch, job_id, make_circuits, attempts)
+            results[batch] = bits
+            if on_result:
+                on_result(batch, bits)
+
+        await asyncio.gather(*(one(batch) for batch in batches))
+        return results
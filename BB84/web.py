@@ -1,67 +1,43 @@
 # Qiskit patterns step 1: Map your problem to quantum circuit
 # Import some generic packages
 
-import numpy as np
-from qiskit import QuantumCircuit, Aer, transpile, assemble, execute
+from bb84 import build_circuit, run_aer, sift
+from randomness import party_generators, random_bits
 
-# Set up a random number generator and a quantum circuit.
-bit_num = 20
-rng = np.random.default_rng()
-qc = QuantumCircuit(bit_num, bit_num)
 
-# QKD step 1: Random bits and bases for Alice
-abits = np.round(rng.random(bit_num))
-abase = np.round(rng.random(bit_num))
+def main(bit_num=20, draw=True, seed=None):
+    # Set up a random number generator per party.
+    rng = party_generators(seed)
 
-# Alice's state preparation
-for n in range(bit_num):
-    if abits[n] == 0:
-        if abase[n] == 1:
-            qc.h(n)
-    if abits[n] == 1:
-        if abase[n] == 0:
-            qc.x(n)
-        if abase[n] == 1:
-            qc.x(n)
-            qc.h(n)
+    # QKD step 1: Random bits and bases for Alice
+    abits = random_bits(rng["alice"], bit_num)
+    abase = random_bits(rng["alice"], bit_num)
 
-qc.barrier()
+    # QKD step 2: Random bases for Bob, then Alice's state preparation and Bob's measurement
+    bbase = random_bits(rng["bob"], bit_num)
+    qc = build_circuit(abits, abase, bbase)
 
-# QKD step 2: Random bases for Bob
-bbase = np.round(rng.random(bit_num))
+    # Print Alice's and Bob's setup
+    print("Alice's bits are ", abits)
+    print("Alice's bases are ", abase)
+    print("Bob's bases are ", bbase)
 
-for m in range(bit_num):
-    if bbase[m] == 1:
-        qc.h(m)
-    qc.measure(m, m)
+    # Draw the circuit
+    if draw:
+        qc.draw(output='mpl', style='clifford')
 
-# Print Alice's and Bob's setup
-print("Alice's bits are ", abits)
-print("Alice's bases are ", abase)
-print("Bob's bases are ", bbase)
+    # Simulate Bob's measurement
+    bob_bits = run_aer(qc)
 
-# Draw the circuit
-qc.draw(output='mpl', style='clifford')
+    print("Bob's measured bits are ", bob_bits)
 
-# Simulate Bob's measurement
-sim = Aer.get_backend('qasm_simulator')
-tqc = transpile(qc, sim)
-qobj = assemble(tqc)
-result = execute(qc, backend=sim, shots=1).result()
-counts = result.get_counts()
-measured_str = list(counts.keys())[0]  # e.g. '010101...'
-bob_bits = [int(bit) for bit in measured_str[::-1]]  # reverse for little-endian
+    # Sifted key: keep only bits where Alice and Bob chose the same basis
+    sifted_alice, sifted_bob = sift(abits, abase, bbase, bob_bits)
 
-print("Bob's measured bits are ", bob_bits)
+    print("Sifted Alice's bits are ", sifted_alice)
+    print("Sifted Bob's bits are ", sifted_bob)
+    return qc
 
-# Sifted key: keep only bits where Alice and Bob chose the same basis
-sifted_alice = []
-sifted_bob = []
 
-for i in range(bit_num):
-    if abase[i] == bbase[i]:
-        sifted_alice.append(int(abits[i]))
-        sifted_bob.append(bob_bits[i])
-
-print("Sifted Alice's bits are ", sifted_alice)
-print("Sifted Bob's bits are ", sifted_bob)
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("qiskit")
+qiskit_aer = pytest.importorskip("qiskit_aer")
+
+from Alterbits import sift_and_qber
+from bb84 import build_circuit
+from bb84_batch import run_batch
+
+
+def _random_bits(rng, n):
+    return rng.integers(0, 2, n)
+
+
+@pytest.mark.parametrize("bit_num", [4, 8, 16, 24])
+def test_circuit_build(benchmark, bit_num):
+    rng = np.random.default_rng(0)
+    abits, abase, bbase = (_random_bits(rng, bit_num) for _ in range(3))
+    benchmark(build_circuit, abits, abase, bbase)
+
+
+@pytest.mark.parametrize("bit_num", [4, 8, 16, 24])
+def test_circuit_build_and_aer_run(benchmark, bit_num):
+    rng = np.random.default_rng(0)
+    abits, abase, bbase = (_random_bits(rng, bit_num) for _ in range(3))
+    sim = qiskit_aer.AerSimulator()
+
+    def run():
+        qc = build_circuit(abits, abase, bbase)
+        return sim.run(qc, shots=1).result().get_counts()
+
+    benchmark(run)
+
+
+@pytest.mark.parametrize("n", [16, 1024, 65536])
+def test_sifting_and_qber(benchmark, n):
+    rng = random.Random(0)
+    alice_bits, alice_bases, bob_bases, bob_bits = ([rng.randint(0, 1) for _ in range(n)] for _ in range(4))
+    benchmark(sift_and_qber, alice_bits, alice_bases, bob_bases, bob_bits)
+
+
+@pytest.mark.parametrize("backend", ["numpy", "aer"])
+def test_run_batch(benchmark, backend):
+    benchmark(run_batch, 4096, np.random.SeedSequence(0), backend, 0.1)
@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("flask")
+
+import eg
+from internship_catalog import InternshipCatalog
+from internship_index import InternshipIndex, calculate_similarity
+
+SKILLS = ["python", "excel", "sql", "java", "marketing", "analytics", "accounting", "design",
+          "writing", "web development", "database", "programming", "social media", "finance"]
+SECTORS = ["Technology", "Banking & Finance", "IT Services", "Healthcare", "Education"]
+LOCATIONS = ["Delhi", "Mumbai", "Bangalore", "Pune", "Remote"]
+PROFILE = {"skills": "Python, SQL, data analysis", "sector": "Technology", "location": "Delhi"}
+
+
+def synthetic_catalog(count, seed=0):
+    rng = random.Random(seed)
+    return [{"id": i, "title": f"Intern {i}", "company": f"Company {i % 97}", "sector": rng.choice(SECTORS),
+             "skills_required": rng.sample(SKILLS, rng.randint(1, 5)), "location": rng.choice(LOCATIONS),
+             "description": "", "duration": "3 months", "stipend": "₹10,000/month"} for i in range(count)]
+
+
+def test_calculate_similarity(benchmark):
+    benchmark(calculate_similarity, PROFILE, eg.INTERNSHIPS_DATA[2])
+
+
+def test_index_score(benchmark):
+    internships = synthetic_catalog(1000)
+    index = InternshipIndex(internships)
+    scores = benchmark(index.score, PROFILE)
+    assert scores == pytest.approx([calculate_similarity(PROFILE, i)[0] for i in internships])
+
+
+@pytest.mark.parametrize("count", [1000, 100000])
+def test_catalog_top_k(benchmark, count):
+    catalog = InternshipCatalog(records=synthetic_catalog(count))
+    benchmark(catalog.top_k, PROFILE, 5)
+
+
+def test_recommend_endpoint_uncached(benchmark):
+    client = eg.app.test_client()
+
+    def request():
+        eg.RECOMMENDATION_CACHE.entries.clear()
+        return client.post("/api/recommend", json=PROFILE)
+
+    assert benchmark(request).status_code == 200
+
+
+def test_recommend_endpoint_cached(benchmark):
+    client = eg.app.test_client()
+    assert benchmark(client.post, "/api/recommend", json=PROFILE).status_code == 200
@@ -0,0 +1,25 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+import finalc
+
+MESSAGES = {"short": "hello", "1k": "quantum key distribution " * 40, "64k": "x" * 65536}
+
+
+@pytest.mark.parametrize("size", list(MESSAGES))
+def test_text_to_bits(benchmark, size):
+    benchmark(finalc.text_to_bits, MESSAGES[size])
+
+
+@pytest.mark.parametrize("size", list(MESSAGES))
+def test_otp_encrypt(benchmark, size):
+    bits = finalc.text_to_bits(MESSAGES[size])
+    key = finalc.np.array([1, 0, 0])
+    benchmark(finalc.otp_encrypt, bits, key)
+
+
+@pytest.mark.parametrize("size", list(MESSAGES))
+def test_bits_to_text(benchmark, size):
+    bits = finalc.text_to_bits(MESSAGES[size])
+    benchmark(finalc.bits_to_text, bits)
@@ -0,0 +1,13 @@
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("flask")
+
+from grover import grover_backend
+
+
+@pytest.mark.parametrize("n_qubits", range(1, 11))
+def test_grover_backend(benchmark, n_qubits):
+    # The optimal iteration count, as a user exploring the demo would pick it
+    iterations = max(1, round(3.14159 / 4 * (2 ** n_qubits) ** 0.5))
+    benchmark(grover_backend, n_qubits, 2 ** n_qubits - 1, iterations)
@@ -0,0 +1,37 @@
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT
+
+# Cold start of a fresh interpreter importing each module: what a CLI run or
+# a web worker boot pays before doing any work. The qiskit rows are the cost
+# the BB84 scripts now defer until a circuit is actually built.
+MODULES = {
+    "cli": ["quna", "Alterbits", "finalc", "dynamic", "step_2", "shors", "shor_batch"],
+    "web": ["eg", "grover"],
+    "reference": ["numpy", "qiskit", "qiskit_aer"],
+}
+
+
+def _cold_import(module):
+    code = f"import sys; sys.path[:0] = [{ROOT!r}, {ROOT + '/BB84'!r}]; import {module}"
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=ROOT,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def _importable(module):
+    try:
+        _cold_import(module)
+    except subprocess.CalledProcessError:
+        return False
+    return True
+
+
+@pytest.mark.parametrize("module", [m for group in MODULES.values() for m in group])
+def test_cold_import(benchmark, module):
+    if not _importable(module):
+        pytest.skip(f"{module} or one of its dependencies is not installed")
+    benchmark.group = next(group for group, mods in MODULES.items() if module in mods)
+    benchmark.pedantic(_cold_import, args=(module,), rounds=5, iterations=1)
@@ -0,0 +1,15 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from randomness import METHODS
+
+BITS = 1 << 22
+
+
+@pytest.mark.parametrize("method", list(METHODS))
+def test_random_bit_throughput(benchmark, method):
+    rng = np.random.default_rng(0)
+    benchmark(METHODS[method], rng, BITS)
+    if benchmark.stats:   # None under --benchmark-disable
+        benchmark.extra_info["gbit_per_s"] = BITS / benchmark.stats.stats.min / 1e9
@@ -0,0 +1,28 @@
+import random
+
+import pytest
+
+from rsa_core import mod_inv, mod_pow
+from rsa_keygen import generate_keypair
+from shor_engine import factorize
+
+# shors.py is a Streamlit script; factorize_n there delegates to shor_engine.factorize
+
+
+@pytest.mark.parametrize("bits", [16, 32, 48, 64])
+def test_factorize(benchmark, bits):
+    p, q, N, d = generate_keypair(bits // 2, rng=random.Random(bits))
+    result = benchmark(factorize, N, 0)
+    assert {result["p"], result["q"]} == {p, q}
+
+
+@pytest.mark.parametrize("bits", [64, 512, 2048])
+def test_mod_inv(benchmark, bits):
+    m = random.Random(bits).getrandbits(bits) | 1
+    benchmark(mod_inv, 65537, m if m % 65537 else m + 2)
+
+
+@pytest.mark.parametrize("bits", [64, 512, 2048])
+def test_mod_pow(benchmark, bits):
+    rng = random.Random(bits)
+    benchmark(mod_pow, rng.getrandbits(bits), rng.getrandbits(bits), rng.getrandbits(bits) | 1)
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The apps and scripts live at the repository root and in BB84/, not in a package
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "BB84")]
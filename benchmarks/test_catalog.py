@@ -0,0 +1,134 @@
+import json
+import os
+import threading
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import internship_catalog
+from internship_catalog import (DELTA_FILE, InternshipCatalog, append_delta, build_catalog, compact_catalog,
+                                current_version, prune_versions)
+
+
+def record(internship_id, skills=("python",), sector="IT", title=None):
+    return {"id": internship_id, "title": title or f"Intern {internship_id}", "company": "Acme", "sector": sector,
+            "skills_required": list(skills), "location": "Delhi", "description": "", "duration": "3 months",
+            "stipend": "₹10,000/month"}
+
+
+@pytest.fixture
+def root(tmp_path):
+    build_catalog([record(i) for i in range(5)], str(tmp_path))
+    return str(tmp_path)
+
+
+def ids(catalog):
+    return sorted(r["id"] for r in catalog.records())
+
+
+def test_delta_upsert_and_delete(root):
+    catalog = InternshipCatalog(root)
+    generation = catalog.generation
+    append_delta(root, [record(2, title="Updated"), record(7)], deleted_ids=[0])
+
+    assert catalog.refresh(force=True)
+    assert catalog.generation == generation + 1
+    assert ids(catalog) == [1, 2, 3, 4, 7]
+    assert len(catalog) == 5
+    assert {r["id"]: r["title"] for r in catalog.records()}[2] == "Updated"
+    assert not catalog.refresh(force=True)   # nothing new
+
+
+def test_delete_then_reinsert(root):
+    catalog = InternshipCatalog(root)
+    append_delta(root, deleted_ids=[3])
+    catalog.refresh(force=True)
+    append_delta(root, [record(3, title="Back")])
+    catalog.refresh(force=True)
+    assert ids(catalog) == [0, 1, 2, 3, 4]
+
+
+def test_partial_delta_line_waits_for_next_refresh(root):
+    catalog = InternshipCatalog(root)
+    path = os.path.join(root, current_version(root), DELTA_FILE)
+    line = json.dumps(record(9)) + "\n"
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(line[:10])
+    assert not catalog.refresh(force=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(line[10:])
+    assert catalog.refresh(force=True)
+    assert 9 in ids(catalog)
+
+
+def test_top_k_ranks_overlay_and_hides_superseded_rows(root):
+    catalog = InternshipCatalog(root)
+    append_delta(root, [record(1, skills=("sql",), sector="Finance"), record(8, skills=("python", "sql"))])
+    catalog.refresh(force=True)
+    top = catalog.top_k({"skills": "python, sql", "sector": "IT", "location": "Delhi"}, k=3)
+    assert [r["id"] for r, _ in top] == [8, 0, 2]
+    # The base row for id 1 is hidden: only the overlay version is ever returned
+    assert [r["sector"] for r, _ in catalog.top_k({"skills": "sql"}, k=10) if r["id"] == 1] == ["Finance"]
+
+
+def test_new_base_version_replaces_overlay(root):
+    catalog = InternshipCatalog(root)
+    append_delta(root, [record(7)])
+    catalog.refresh(force=True)
+    build_catalog([record(i) for i in range(10, 13)], root)
+    assert catalog.refresh(force=True)
+    assert ids(catalog) == [10, 11, 12]
+
+
+def test_compact_folds_deltas_and_prunes_versions(root):
+    append_delta(root, [record(7)], deleted_ids=[0])
+    for _ in range(3):
+        compact_catalog(root)
+    versions = [name for name in os.listdir(root) if name.startswith("v")]
+    assert len(versions) == internship_catalog.KEEP_VERSIONS
+    assert current_version(root) in versions
+    assert ids(InternshipCatalog(root)) == [1, 2, 3, 4, 7]
+    assert prune_versions(root, keep=1) == [v for v in versions if v != current_version(root)]
+
+
+def test_appends_during_compaction_are_kept(root):
+    def append(start):
+        for i in range(start, start + 50):
+            append_delta(root, [record(i)])
+
+    threads = [threading.Thread(target=append, args=(start,)) for start in (100, 200)]
+    threads.append(threading.Thread(target=lambda: [compact_catalog(root) for _ in range(5)]))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert ids(InternshipCatalog(root)) == list(range(5)) + list(range(100, 150)) + list(range(200, 250))
+
+
+def test_readers_see_whole_snapshots_during_refresh(root):
+    catalog = InternshipCatalog(root)
+    errors, done = [], threading.Event()
+
+    def read():
+        while not done.is_set():
+            try:
+                snap = catalog.snapshot
+                # Every published snapshot hides exactly the base rows its overlay replaces
+                assert len(snap.hidden_rows) == len(set(snap.overlay) & set(range(5)))
+                assert [r["id"] for r in snap.overlay_records] == list(snap.overlay)
+                catalog.top_k({"skills": "python"}, k=3)
+            except Exception as e:   # AssertionError included
+                errors.append(e)
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for t in readers:
+        t.start()
+    for i in range(40):
+        append_delta(root, [record(i % 8)])
+        catalog.refresh(force=True)
+    done.set()
+    for t in readers:
+        t.join()
+    assert not errors
+    assert ids(catalog) == list(range(8))
@@ -0,0 +1,152 @@
+import io
+import os
+import signal
+import time
+
+import pytest
+
+import resume_parser
+from resume_parser import DONE, FAILED, PENDING, ResumeJobQueue, ResumeJobStore, ResumeTooLarge
+
+RESUME = b"B.Tech in Computer Science. Skills: Python, SQL, teamwork."
+
+
+@pytest.fixture
+def queue():
+    q = ResumeJobQueue(workers=1)
+    yield q
+    if q.pool is not None:
+        q.pool.shutdown(cancel_futures=True)
+
+
+def pdf_with_pages(count):
+    pypdf = pytest.importorskip("pypdf")
+    writer = pypdf.PdfWriter()
+    for _ in range(count):
+        writer.add_blank_page(72, 72)
+    buf = io.BytesIO()
+    writer.write(buf)
+    return buf.getvalue()
+
+
+def test_text_upload_is_parsed(queue):
+    status = queue.poll(queue.submit("resume.txt", RESUME), timeout=30)
+    assert status == {"status": DONE, "extracted_data": {"skills": "python, sql, teamwork",
+                                                         "education": "B.Tech/Engineering"}}
+
+
+def test_same_upload_reuses_extracted_text(queue):
+    queue.poll(queue.submit("resume.txt", RESUME), timeout=30)
+    job_id = queue.submit("again.txt", RESUME)
+    assert job_id not in queue.futures   # answered from the store, not the pool
+    assert queue.store.get(job_id)["status"] == DONE
+
+
+def test_unknown_job(queue):
+    assert queue.poll("no-such-job") is None
+
+
+def test_oversized_upload_is_rejected_before_queueing(queue):
+    with pytest.raises(ResumeTooLarge):
+        queue.submit("huge.txt", b"x" * (resume_parser.MAX_UPLOAD_BYTES + 1))
+    assert queue.pool is None
+
+
+def test_too_many_pages_fails_with_its_type(queue):
+    status = queue.poll(queue.submit("long.pdf", pdf_with_pages(resume_parser.MAX_PDF_PAGES + 1)), timeout=30)
+    assert status["status"] == FAILED
+    assert status["error_type"] == ResumeTooLarge.__name__
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGKILL"), reason="needs SIGKILL")
+def test_pool_is_replaced_after_a_worker_dies(queue):
+    queue.poll(queue.submit("resume.txt", RESUME), timeout=30)
+    for process in list(queue.pool._processes.values()):
+        os.kill(process.pid, signal.SIGKILL)
+    deadline = time.monotonic() + 10
+    while not queue.pool._broken and time.monotonic() < deadline:
+        time.sleep(0.05)
+    status = queue.poll(queue.submit("other.txt", b"MBA, excel"), timeout=30)
+    assert status["status"] == DONE
+    assert status["extracted_data"]["skills"] == "excel"
+
+
+def test_job_is_visible_to_another_queue_on_the_same_store(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    first, second = ResumeJobQueue(workers=1, store=ResumeJobStore(path)), ResumeJobQueue(store=ResumeJobStore(path))
+    try:
+        job_id = first.submit("resume.txt", RESUME)
+        # `second` has no future for the job and must wait on the shared row
+        status = second.poll(job_id, timeout=30)
+        assert status["status"] == DONE
+        assert status["extracted_data"]["education"] == "B.Tech/Engineering"
+        # ...and reuses the text `first` extracted instead of starting its own pool
+        second.submit("copy.txt", RESUME)
+        assert second.pool is None
+    finally:
+        first.pool.shutdown()
+
+
+def test_failure_is_visible_to_another_queue_on_the_same_store(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    first, second = ResumeJobQueue(workers=1, store=ResumeJobStore(path)), ResumeJobQueue(store=ResumeJobStore(path))
+    try:
+        job_id = first.submit("long.pdf", pdf_with_pages(resume_parser.MAX_PDF_PAGES + 1))
+        status = second.poll(job_id, timeout=30)
+        assert status["status"] == FAILED
+        assert status["error_type"] == ResumeTooLarge.__name__
+    finally:
+        first.pool.shutdown()
+
+
+def test_pending_job_of_an_exited_process_goes_stale(monkeypatch):
+    store = ResumeJobStore()
+    store.create("orphan", "digest")
+    queue = ResumeJobQueue(store=store)
+    assert queue.poll("orphan") == {"status": PENDING}
+    monkeypatch.setattr(resume_parser, "STALE_JOB_SECONDS", -1)
+    status = queue.poll("orphan")
+    assert status["status"] == FAILED
+    assert status["error_type"] == "JobLost"
+
+
+def test_store_keeps_the_newest_jobs():
+    store = ResumeJobStore(max_jobs=3)
+    for i in range(5):
+        store.create(f"job{i}", f"digest{i}", text="text")
+    assert [store.get(f"job{i}") is not None for i in range(5)] == [False, False, True, True, True]
+
+
+# --- Through the Flask app ---
+@pytest.fixture
+def client():
+    pytest.importorskip("flask")
+    pytest.importorskip("flask_cors")
+    import eg
+    return eg.app.test_client()
+
+
+def upload(client, path, filename, content):
+    return client.post(path, data={"resume": (io.BytesIO(content), filename)}, content_type="multipart/form-data")
+
+
+def test_submit_then_poll_endpoint(client):
+    response = upload(client, "/api/extract-resume/jobs", "resume.txt", RESUME + b" " + os.urandom(8).hex().encode())
+    assert response.status_code in (200, 202)
+    job_id = response.get_json()["job_id"]
+    deadline = time.monotonic() + 30
+    while response.status_code == 202 and time.monotonic() < deadline:
+        time.sleep(0.1)
+        response = client.get(f"/api/extract-resume/jobs/{job_id}")
+    assert response.status_code == 200
+    assert response.get_json()["extracted_data"]["skills"] == "python, sql, teamwork"
+
+
+def test_too_many_pages_is_413(client):
+    response = upload(client, "/api/extract-resume", "long.pdf", pdf_with_pages(resume_parser.MAX_PDF_PAGES + 1))
+    assert response.status_code == 413
+    assert response.get_json()["error_type"] == ResumeTooLarge.__name__
+
+
+def test_unknown_job_is_404(client):
+    assert client.get("/api/extract-resume/jobs/no-such-job").status_code == 404
@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("qiskit")
+pytest.importorskip("qiskit_aer")
+
+from bb84 import build_circuit
+from bb84_batch import run_session
+from runtime_jobs import DONE, FakeRuntimeClient, JobManager, JobStore
+
+WIDTH = 6
+
+
+def expected_bits(batch):
+    return [(batch >> i) & 1 for i in range(WIDTH)]
+
+
+def make_circuits(batch):
+    # Matching bases, so Bob reads Alice's bits exactly: the batch index in binary
+    zeros = [0] * WIDTH
+    return [build_circuit(expected_bits(batch), zeros, zeros)]
+
+
+class CountingClient(FakeRuntimeClient):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.submits = 0
+
+    def submit(self, circuits, shots=1):
+        self.submits += 1
+        return super().submit(circuits, shots)
+
+
+class FailingClient(CountingClient):
+    def status(self, job_id):
+        return "ERROR"
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = JobStore(str(tmp_path / "jobs.sqlite"))
+    yield s
+    s.close()
+
+
+def run(client, store, batches, run_id="run", **kwargs):
+    manager = JobManager(client, store, run_id, poll_interval=0.01, **kwargs)
+    return manager, asyncio.run(manager.run(batches, make_circuits))
+
+
+def test_run_completes_and_records_results(store):
+    client = CountingClient()
+    seen = []
+    manager = JobManager(client, store, "run", poll_interval=0.01, max_in_flight=2)
+    results = asyncio.run(manager.run(range(5), make_circuits, lambda batch, bits: seen.append(batch)))
+    assert results == {batch: expected_bits(batch) for batch in range(5)}
+    assert sorted(seen) == list(range(5))
+    assert client.submits == 5
+    assert manager.resumed == 0
+    assert {row["status"] for row in store.jobs("run").values()} == {DONE}
+
+
+def test_second_manager_reuses_finished_results(store):
+    run(CountingClient(), store, range(4))
+    client = CountingClient()
+    manager, results = run(client, store, range(4))
+    assert results == {batch: expected_bits(batch) for batch in range(4)}
+    assert client.submits == 0
+    assert manager.resumed == 4
+
+
+def test_runs_do_not_share_results(store):
+    run(CountingClient(), store, range(2), run_id="first")
+    client = CountingClient()
+    run(client, store, range(2), run_id="second")
+    assert client.submits == 2
+
+
+def test_unknown_job_of_an_interrupted_run_is_resubmitted(store):
+    # A job submitted before a restart: the fresh client has never heard of its id
+    store.record_submit("run", 0, "fake-from-before-the-restart")
+    client = CountingClient()
+    manager, results = run(client, store, [0, 1])
+    assert results == {0: expected_bits(0), 1: expected_bits(1)}
+    assert manager.resumed == 1
+    assert client.submits == 2
+    rows = store.jobs("run")
+    assert rows[0]["attempts"] == 2
+    assert rows[1]["attempts"] == 1
+
+
+def test_queued_jobs_are_polled_until_done(store):
+    client = CountingClient(latency=0.1)
+    _, results = run(client, store, range(3))
+    assert results == {batch: expected_bits(batch) for batch in range(3)}
+    assert client.submits == 3
+
+
+def test_failed_job_gives_up_after_retries(store):
+    client = FailingClient()
+    with pytest.raises(RuntimeError, match="batch 0 failed after 3 attempts"):
+        run(client, store, [0], retries=2)
+    assert client.submits == 3
+    row = store.jobs("run")[0]
+    assert row["status"] == "ERROR"
+    assert row["attempts"] == 3
+
+
+def test_open_run_keeps_the_first_parameters(store):
+    assert store.open_run("run", {"batch_size": 64}) == {"batch_size": 64}
+    assert store.open_run("run", {"batch_size": 128}) == {"batch_size": 64}
+
+
+def test_session_resumes_on_the_fake_runtime(tmp_path):
+    path = str(tmp_path / "bb84_jobs.sqlite")
+    key, stats = run_session(64, backend="runtime-fake", batch_size=64, seed=7, key="sifted", store=path,
+                             run_id="resume-me", poll=0.01)
+    assert len(key) == 64
+    assert stats["resumed_batches"] == 0
+    # Same run id, different seed and batch size: the stored parameters and results win
+    again, stats = run_session(64, backend="runtime-fake", batch_size=32, seed=8, key="sifted", store=path,
+                               run_id="resume-me", poll=0.01)
+    assert stats["resumed_batches"] == stats["batches"]
+    assert stats["batch_size"] == 64
+    assert list(again) == list(key)
@@ -0,0 +1,50 @@
+# gunicorn -c deploy/gunicorn_eg.conf.py
+import gc
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+wsgi_app = "eg:app"
+bind = os.environ.get("BIND", "0.0.0.0:8080")
+worker_class = "gthread"
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+# Resume uploads are parsed in a separate process pool; requests wait for it at most 30 s.
+timeout = 60
+keepalive = 5
+max_requests = 10000
+max_requests_jitter = 1000
+
+# Import eg (catalog, index, matcher) once in the master; workers inherit it by fork.
+preload_app = True
+
+# Workers share their /metrics histograms through this directory, so a scrape of
+# /metrics reports the whole server whichever worker answers it. Point one
+# Prometheus target at the bind address; no per-worker labels or targets needed.
+METRICS_DIR = os.environ.setdefault("METRICS_DIR", os.path.join(tempfile.gettempdir(), "eg-metrics"))
+
+
+# Resume jobs are polled on whichever worker accepts the request, so their state
+# lives in one SQLite file. Each worker also starts its own parser pool: keep it
+# small, since there are already 2 x CPU + 1 workers.
+RESUME_JOBS_DB = os.environ.setdefault("RESUME_JOBS_DB", os.path.join(tempfile.gettempdir(), "eg-resume-jobs.sqlite3"))
+os.environ.setdefault("RESUME_PARSE_WORKERS", "1")
+
+
+def on_starting(server):
+    # Start from zero: no metric counts or resume jobs from a previous run
+    shutil.rmtree(METRICS_DIR, ignore_errors=True)
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(RESUME_JOBS_DB + suffix):
+            os.remove(RESUME_JOBS_DB + suffix)
+
+
+def when_ready(server):
+    import eg
+    eg.warm_up()
+    # Keep the preloaded objects out of the collector so workers do not copy their pages.
+    gc.freeze()
@@ -0,0 +1,37 @@
+# gunicorn -c deploy/gunicorn_grover.conf.py
+import gc
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+wsgi_app = "grover:app"
+bind = os.environ.get("BIND", "0.0.0.0:5000")
+worker_class = "gthread"
+# /simulate is CPU-bound numpy work: one worker per core, few threads each.
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+threads = int(os.environ.get("GUNICORN_THREADS", 2))
+timeout = 30
+keepalive = 5
+max_requests = 10000
+max_requests_jitter = 1000
+preload_app = True
+
+# Workers share their /metrics histograms through this directory, so a scrape of
+# /metrics reports the whole server whichever worker answers it. Point one
+# Prometheus target at the bind address; no per-worker labels or targets needed.
+METRICS_DIR = os.environ.setdefault("METRICS_DIR", os.path.join(tempfile.gettempdir(), "grover-metrics"))
+
+
+def on_starting(server):
+    # Files from a previous run would carry its counts into this one
+    shutil.rmtree(METRICS_DIR, ignore_errors=True)
+
+
+def when_ready(server):
+    import grover
+    grover.warm_up()
+    gc.freeze()
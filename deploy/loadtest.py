@@ -0,0 +1,188 @@
+"""Pure-asyncio HTTP load generator for the Flask apps.
+
+    python deploy/loadtest.py recommend --port 8080 --concurrency 32 --duration 10
+    python deploy/loadtest.py extract-resume --port 8080
+    python deploy/loadtest.py simulate --port 5000
+
+Each virtual user keeps one HTTP/1.1 keep-alive connection open and sends
+requests back to back; latency percentiles and throughput are printed at
+the end.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+
+def _recommend(rng):
+    skills = rng.sample(["python", "excel", "sql", "analytics", "accounting", "web development",
+                         "social media", "content writing", "database", "programming"], rng.randint(1, 4))
+    body = json.dumps({"skills": ", ".join(skills),
+                       "sector": rng.choice(["Technology", "Banking", "IT", ""]),
+                       "location": rng.choice(["Delhi", "Mumbai", "Bangalore", ""]),
+                       "education": "Graduate"}).encode()
+    return "POST", "/api/recommend", "application/json", body
+
+
+RESUME_LINES = ["B.Tech in Computer Science.",
+                "Skills: Python, SQL, machine learning, data analysis,",
+                "communication, teamwork, project management.",
+                "Internship at TechCorp."] * 20
+
+
+def resume_pdf(lines):
+    """A one-page PDF showing `lines` in Helvetica, built without any PDF library"""
+    escape = lambda line: line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    stream = "BT /F1 9 Tf 40 800 Td 10 TL " + " ".join(f"({escape(l)}) '" for l in lines) + " ET"
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>",
+               "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+               "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents 4 0 R "
+               "/Resources << /Font << /F1 5 0 R >> >> >>",
+               f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream",
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    out, offsets = b"%PDF-1.4\n", []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{obj}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
+
+
+def _extract_resume(rng):
+    # A fresh nonce per upload, so the server's content-hash text cache never answers
+    # and the latency includes parsing; half the uploads are PDFs
+    boundary = f"loadtest{rng.getrandbits(64):x}"
+    lines = RESUME_LINES + [f"Reference {rng.getrandbits(64):x}"]
+    if rng.random() < 0.5:
+        filename, content_type, content = "resume.pdf", "application/pdf", resume_pdf(lines)
+    else:
+        filename, content_type, content = "resume.txt", "text/plain", "\n".join(lines).encode()
+    body = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"resume\"; filename=\"{filename}\"\r\n"
+            f"Content-Type: {content_type}\r\n\r\n").encode() + content + f"\r\n--{boundary}--\r\n".encode()
+    return "POST", "/api/extract-resume", f"multipart/form-data; boundary={boundary}", body
+
+
+def _simulate(rng):
+    n = rng.randint(1, 10)
+    body = json.dumps({"n_qubits": n, "secret_index": rng.randrange(2 ** n),
+                       "iterations": rng.randint(1, 20)}).encode()
+    return "POST", "/simulate", "application/json", body
+
+
+SCENARIOS = {"recommend": _recommend, "extract-resume": _extract_resume, "simulate": _simulate}
+
+
+async def _read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("server closed the connection")
+    status = int(status_line.split()[1])
+    length, chunked = 0, False
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        name = name.strip().lower()
+        if name == "content-length":
+            length = int(value)
+        elif name == "transfer-encoding" and "chunked" in value.lower():
+            chunked = True
+    if chunked:
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        await reader.readexactly(length)
+    return status
+
+
+RECONNECT_DELAY = 0.05
+MAX_RECONNECT_DELAY = 1.0
+
+
+async def _user(host, port, scenario, deadline, latencies, errors, seed):
+    rng = random.Random(seed)
+    reader = writer = None
+    delay = RECONNECT_DELAY
+    while time.perf_counter() < deadline:
+        method, path, content_type, body = scenario(rng)
+        request = (f"{method} {path} HTTP/1.1\r\nHost: {host}:{port}\r\nContent-Type: {content_type}\r\n"
+                   f"Content-Length: {len(body)}\r\nConnection: keep-alive\r\n\r\n").encode() + body
+        t0 = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            writer.write(request)
+            await writer.drain()
+            status = await _read_response(reader)
+        except (ConnectionError, asyncio.IncompleteReadError, OSError):
+            errors.append("connection")
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            # Back off so a server that is down does not turn the run into a busy loop
+            await asyncio.sleep(min(delay, max(0.0, deadline - time.perf_counter())))
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+            continue
+        delay = RECONNECT_DELAY
+        latencies.append(time.perf_counter() - t0)
+        if status >= 400:
+            errors.append(status)
+    if writer is not None:
+        writer.close()
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return float("nan")
+    k = min(len(sorted_values) - 1, max(0, round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+async def run(host, port, endpoint, concurrency, duration):
+    latencies, errors = [], []
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(_user(host, port, SCENARIOS[endpoint], deadline, latencies, errors, i)
+                           for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "endpoint": endpoint,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test /api/recommend, /api/extract-resume or /simulate")
+    parser.add_argument("endpoint", choices=sorted(SCENARIOS))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args.host, args.port, args.endpoint, args.concurrency, args.duration))
+    if args.json:
+        print(json.dumps(report))
+    else:
+        print(f"{report['endpoint']}: {report['requests']} requests, {report['errors']} errors, "
+              f"{report['rps']:.1f} req/s")
+        print(f"  p50 {report['p50_ms']:.2f} ms   p95 {report['p95_ms']:.2f} ms   p99 {report['p99_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,24 @@
 from flask import Flask, request, jsonify, render_template_string
 from flask_cors import CORS
-import re
-import io
-import pypdf
-from docx import Document
+from werkzeug.exceptions import RequestEntityTooLarge
+import os
+from internship_catalog import InternshipCatalog
+from metrics import instrument_app, span, timed, unrecorded
+from recommend_cache import RecommendationCache, normalize_profile
+from resume_parser import MAX_UPLOAD_BYTES, ResumeJobQueue, ResumeJobStore, ResumeTooLarge
 
 app = Flask(__name__)
+app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_BYTES + 64 * 1024   # multipart overhead
 CORS(app)
+instrument_app(app, 'eg')
+
+# Resume parsing happens in a process pool so a large PDF never stalls a request thread.
+# Under a multi-worker server set RESUME_JOBS_DB to a SQLite file every worker can
+# reach, so a job polled on another worker is still found, and RESUME_PARSE_WORKERS
+# to the parser processes each server worker may start (default: one per CPU).
+RESUME_JOBS = ResumeJobQueue(workers=int(os.environ.get('RESUME_PARSE_WORKERS', 0)) or None,
+                             store=ResumeJobStore(os.environ.get('RESUME_JOBS_DB')))
+RESUME_WAIT_SECONDS = 30
 
 # Mock internship dataset
 INTERNSHIPS_DATA = [
@@ -24,38 +36,32 @@ INTERNSHIPS_DATA = [
      "duration": "4 months", "stipend": "₹25,000/month"},
     # Add more internships as needed
 ]
+# Set INTERNSHIP_CATALOG to a directory built with `python internship_catalog.py build`
+# to serve a real catalog; otherwise the mock data above is used.
+CATALOG_ROOT = os.environ.get('INTERNSHIP_CATALOG')
+CATALOG = InternshipCatalog(root=CATALOG_ROOT) if CATALOG_ROOT else InternshipCatalog(records=INTERNSHIPS_DATA)
+# Serialized /api/recommend bodies keyed on the normalized profile
+RECOMMENDATION_CACHE = RecommendationCache()
 
 # --------------- Recommendation Logic ---------------
-def calculate_similarity(candidate_profile, internship):
-    candidate_skills = [s.strip().lower() for s in candidate_profile.get('skills', '').split(',')]
-    candidate_sector = candidate_profile.get('sector', '').lower()
-    candidate_location = candidate_profile.get('location', '').lower()
-
-    internship_skills = [s.lower() for s in internship['skills_required']]
-    internship_sector = internship['sector'].lower()
-    internship_location = internship['location'].lower()
-
-    skill_matches = len(set(candidate_skills) & set(internship_skills))
-    total_skills = len(set(candidate_skills + internship_skills))
-    skill_similarity = (skill_matches / max(total_skills, 1)) if total_skills > 0 else 0
-
-    sector_similarity = 1.0 if candidate_sector in internship_sector or internship_sector in candidate_sector else 0.0
-    location_similarity = 1.0 if candidate_location in internship_location or internship_location in candidate_location else 0.0
-
-    similarity = (skill_similarity * 0.6) + (sector_similarity * 0.25) + (location_similarity * 0.15)
-    return similarity, skill_matches, len(candidate_skills), len(internship_skills)
+# Shared, never mutated: every result at a level references the same dict
+LEVEL_BEST_FIT = {"level": "Best Fit", "icon": "✅", "bg": "#d4edda"}
+LEVEL_OK = {"level": "OK", "icon": "🙂", "bg": "#d1ecf1"}
+LEVEL_WAIT = {"level": "Wait", "icon": "⏳", "bg": "#fff3cd"}
+LEVEL_SKIP = {"level": "Skip", "icon": "❌", "bg": "#f8d7da"}
 
 def get_recommendation_level(similarity_score):
     if similarity_score >= 0.8:
-        return {"level": "Best Fit", "icon": "✅", "bg": "#d4edda"}
+        return LEVEL_BEST_FIT
     elif similarity_score >= 0.6:
-        return {"level": "OK", "icon": "🙂", "bg": "#d1ecf1"}
+        return LEVEL_OK
     elif similarity_score >= 0.4:
-        return {"level": "Wait", "icon": "⏳", "bg": "#fff3cd"}
+        return LEVEL_WAIT
     else:
-        return {"level": "Skip", "icon": "❌", "bg": "#f8d7da"}
+        return LEVEL_SKIP
 
-def generate_explanation(candidate_profile, internship, skill_matches, total_candidate_skills, total_internship_skills):
+@timed('explanation')
+def generate_explanation(candidate_profile, internship):
     candidate_skills = [s.strip().lower() for s in candidate_profile.get('skills', '').split(',')]
     internship_skills = [s.lower() for s in internship['skills_required']]
     matched_skills = list(set(candidate_skills) & set(internship_skills))
@@ -118,7 +124,12 @@ document.getElementById("resumeForm").addEventListener("submit", async function(
     const formData = new FormData();
     formData.append("resume", document.getElementById("resume").files[0]);
     const res = await fetch("/api/extract-resume", {method:"POST", body: formData});
-    const data = await res.json();
+    let data = await res.json();
+    // Still parsing after the server's wait: poll the job until it finishes
+    while(data.success && data.status === "pending"){
+        await new Promise(r => setTimeout(r, 1000));
+        data = await (await fetch("/api/extract-resume/jobs/" + data.job_id)).json();
+    }
     if(data.success){
         document.getElementById("skills").value = data.extracted_data.skills;
         document.getElementById("education").value = data.extracted_data.education;
@@ -159,65 +170,79 @@ document.getElementById("profileForm").addEventListener("submit", async function
 </html>
 ''')
 
-@app.route('/api/extract-resume', methods=['POST'])
-def extract_resume():
+def _submit_resume():
     try:
         if 'resume' not in request.files:
-            return jsonify({'success': False, 'error': 'No file uploaded'}), 400
+            return None, (jsonify({'success': False, 'error': 'No file uploaded'}), 400)
         file = request.files['resume']
         if file.filename == '':
-            return jsonify({'success': False, 'error': 'No file selected'}), 400
-
-        text = ""
-        if file.filename.endswith('.pdf'):
-            pdf_reader = pypdf.PdfReader(io.BytesIO(file.read()))
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-        elif file.filename.endswith('.docx'):
-            doc = Document(io.BytesIO(file.read()))
-            for para in doc.paragraphs:
-                text += para.text + "\n"
-        else:
-            text = file.read().decode('utf-8', errors='ignore')
-
-        # Skills extraction
-        common_skills = ['python','java','javascript','html','css','react','angular','node.js','data analysis','machine learning','sql','excel','powerpoint','word','communication','teamwork','leadership','problem solving','creativity','accounting','finance','marketing','sales','research','writing','photoshop','illustrator','cad','autocad','design','project management']
-        text_lower = text.lower()
-        found_skills = [s for s in common_skills if s in text_lower]
-
-        # Education extraction
-        education_patterns = [r'b\.?tech|bachelor.*technology|engineering',r'b\.?sc|bachelor.*science',r'b\.?com|bachelor.*commerce',
-                              r'b\.?a|bachelor.*arts',r'm\.?tech|master.*technology',r'm\.?sc|master.*science',r'mba|master.*business',
-                              r'diploma',r'12th|intermediate|higher.*secondary',r'10th|matriculation|secondary']
-        education = "Not specified"
-        for pattern in education_patterns:
-            if re.search(pattern,text_lower):
-                if 'tech' in pattern: education="B.Tech/Engineering"
-                elif 'mba' in pattern: education="MBA"
-                elif 'master' in pattern: education="Post Graduate"
-                elif 'bachelor' in pattern: education="Graduate"
-                elif 'diploma' in pattern: education="Diploma"
-                elif '12th' in pattern: education="12th Pass"
-                break
-
-        return jsonify({'success': True, 'extracted_data': {'skills': ', '.join(found_skills[:10]), 'education': education}})
+            return None, (jsonify({'success': False, 'error': 'No file selected'}), 400)
+        with span('resume_submit'):
+            return RESUME_JOBS.submit(file.filename, file.read()), None
+    except (ResumeTooLarge, RequestEntityTooLarge) as e:
+        return None, (jsonify({'success': False, 'error': str(e)}), 413)
+
+def _job_response(job_id, status):
+    if status is None:
+        return jsonify({'success': False, 'error': 'Unknown job'}), 404
+    if status['status'] == 'failed':
+        code = 413 if status.get('error_type') == ResumeTooLarge.__name__ else 500
+        return jsonify({'success': False, 'job_id': job_id, **status}), code
+    return jsonify({'success': True, 'job_id': job_id, **status}), 200 if status['status'] == 'done' else 202
+
+@app.route('/api/extract-resume', methods=['POST'])
+def extract_resume():
+    try:
+        job_id, error = _submit_resume()
+        if error:
+            return error
+        with span('resume_wait'):
+            status = RESUME_JOBS.poll(job_id, timeout=RESUME_WAIT_SECONDS)
+        return _job_response(job_id, status)
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/extract-resume/jobs', methods=['POST'])
+def submit_resume_job():
+    try:
+        job_id, error = _submit_resume()
+        if error:
+            return error
+        return _job_response(job_id, RESUME_JOBS.poll(job_id))
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/extract-resume/jobs/<job_id>', methods=['GET'])
+def poll_resume_job(job_id):
+    return _job_response(job_id, RESUME_JOBS.poll(job_id))
+
 @app.route('/api/recommend', methods=['POST'])
 def recommend():
     try:
         candidate_profile = request.json
-        recommendations=[]
-        for internship in INTERNSHIPS_DATA:
-            similarity, skill_matches, c_skills, i_skills = calculate_similarity(candidate_profile, internship)
-            recommendation_level = get_recommendation_level(similarity)
-            explanation = generate_explanation(candidate_profile, internship, skill_matches, c_skills, i_skills)
-            recommendations.append({'internship': internship, 'similarity_score': similarity, 'recommendation': recommendation_level, 'explanation': explanation})
-        recommendations.sort(key=lambda x: x['similarity_score'], reverse=True)
-        return jsonify({'success': True, 'recommendations': recommendations[:5]})
+        CATALOG.refresh()
+        key, generation = normalize_profile(candidate_profile), CATALOG.generation
+        body = RECOMMENDATION_CACHE.get(key, generation)
+        if body is None:
+            recommendations=[]
+            with span('score'):
+                top = CATALOG.top_k(candidate_profile, k=5)
+            for internship, similarity in top:
+                recommendation_level = get_recommendation_level(similarity)
+                explanation = generate_explanation(candidate_profile, internship)
+                recommendations.append({'internship': internship, 'similarity_score': similarity, 'recommendation': recommendation_level, 'explanation': explanation})
+            with span('serialize'):
+                body = app.json.dumps({'success': True, 'recommendations': recommendations}) + "\n"
+            RECOMMENDATION_CACHE.put(key, generation, body)
+        return app.response_class(body, mimetype='application/json')
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def warm_up():
+    """Score one query so the catalog index pages are resident before a pre-fork server forks"""
+    with unrecorded():
+        CATALOG.top_k({'skills': 'python', 'sector': '', 'location': ''}, k=5)
+
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=8080)
+    # Development server only; production runs under gunicorn (deploy/gunicorn_eg.conf.py)
+    app.run(debug=os.environ.get('FLASK_DEBUG') == '1', host='0.0.0.0', port=8080)
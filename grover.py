@@ -1,8 +1,12 @@
 from flask import Flask, render_template, request, jsonify
+import os
 import numpy as np
+from metrics import instrument_app, span, timed, unrecorded
 
 app = Flask(__name__)
+instrument_app(app, 'grover')
 
+@timed('grover_backend')
 def grover_backend(n_qubits, secret_index, num_iterations):
     N = 2 ** n_qubits
     state = np.ones(N) / np.sqrt(N)   # uniform superposition
@@ -51,7 +55,14 @@ def simulate():
         return jsonify({"error": "iterations must be between 1 and 100"}), 400
 
     result = grover_backend(n_qubits, secret_index, iterations)
-    return jsonify(result)
+    with span('serialize'):
+        return jsonify(result)
+
+def warm_up():
+    """Run one small simulation so numpy is fully initialised before a pre-fork server forks"""
+    with unrecorded():
+        grover_backend(3, 0, 1)
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    # Development server only; production runs under gunicorn (deploy/gunicorn_grover.conf.py)
+    app.run(debug=os.environ.get("FLASK_DEBUG") == "1")
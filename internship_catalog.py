@@ -0,0 +1,362 @@
+import argparse
+import csv
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:   # Windows: no advisory locks, run one writer at a time
+    fcntl = None
+
+from internship_index import InternshipIndex
+
+# Low-cardinality fields are stored as int32 codes into an interned vocabulary;
+# free text is stored as one UTF-8 blob plus offsets.
+CODED_FIELDS = ["sector", "location", "company", "duration", "stipend"]
+TEXT_FIELDS = ["title", "description"]
+CSV_SKILL_SEPARATOR = ";"
+CURRENT_FILE = "CURRENT"
+DELTA_FILE = "delta.jsonl"
+LOCK_FILE = "LOCK"
+# Versions kept by compaction: CURRENT plus the one before it, which servers
+# that have not refreshed yet may still be opening
+KEEP_VERSIONS = 2
+RELOAD_INTERVAL = 5.0
+
+
+# --- Reading source files ---
+def read_records(path):
+    """Internship dicts from a .jsonl or .csv file (CSV skills are ';'-separated)"""
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.endswith(".csv"):
+            for row in csv.DictReader(f):
+                row["id"] = int(row["id"])
+                row["skills_required"] = [s.strip() for s in row["skills_required"].split(CSV_SKILL_SEPARATOR) if s.strip()]
+                yield row
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _encode_strings(values):
+    lookup = {}
+    codes = np.fromiter((lookup.setdefault(v, len(lookup)) for v in values), dtype=np.int32, count=len(values))
+    return codes, list(lookup)
+
+
+def _pack_text(values):
+    encoded = [v.encode("utf-8") for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8).copy(), offsets
+
+
+# --- Columnar store ---
+class CatalogStore:
+    """Columnar, optionally memory-mapped internship catalog.
+
+    Rows decode lazily to the same dict shape as INTERNSHIPS_DATA in eg.py,
+    so the store can stand in for that list. The scoring index (a CSC skill
+    matrix) is stored alongside the columns and opened without rebuilding.
+    """
+
+    def __init__(self, arrays, meta):
+        self.arrays = arrays
+        self.meta = meta
+        self.vocab = {name: [sys.intern(v) for v in values] for name, values in meta["vocab"].items()}
+
+    @classmethod
+    def from_records(cls, records):
+        records = list(records)
+        arrays = {"ids": np.array([r["id"] for r in records], dtype=np.int64)}
+        vocab = {}
+        for field in CODED_FIELDS:
+            arrays[f"{field}_codes"], vocab[field] = _encode_strings([r[field] for r in records])
+        for field in TEXT_FIELDS:
+            arrays[f"{field}_blob"], arrays[f"{field}_offsets"] = _pack_text([r.get(field, "") for r in records])
+
+        # Row-wise skills (display case) for decoding records
+        skill_lists = [r["skills_required"] for r in records]
+        arrays["skill_codes"], vocab["skills"] = _encode_strings([s for skills in skill_lists for s in skills])
+        arrays["skill_offsets"] = np.zeros(len(records) + 1, dtype=np.int64)
+        np.cumsum([len(s) for s in skill_lists], out=arrays["skill_offsets"][1:])
+
+        # Column-wise lowercase skills for scoring (see InternshipIndex)
+        index = InternshipIndex(records)
+        arrays["index_skill_counts"] = index.skill_counts
+        arrays["index_indptr"] = index.indptr
+        arrays["index_rows"] = index.rows
+        vocab["index_skills"] = list(index.skill_ids)
+        return cls(arrays, {"count": len(records), "vocab": vocab})
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        for name, array in self.arrays.items():
+            np.save(os.path.join(directory, f"{name}.npy"), np.ascontiguousarray(array))
+        with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(self.meta, f)
+
+    @classmethod
+    def open(cls, directory):
+        """Open a saved store with every array memory-mapped read-only"""
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        arrays = {}
+        for name in os.listdir(directory):
+            if name.endswith(".npy"):
+                arrays[name[:-4]] = np.load(os.path.join(directory, name), mmap_mode="r")
+        return cls(arrays, meta)
+
+    def __len__(self):
+        return self.meta["count"]
+
+    def __getitem__(self, row):
+        a = self.arrays
+        record = {"id": int(a["ids"][row])}
+        for field in TEXT_FIELDS:
+            start, end = a[f"{field}_offsets"][row], a[f"{field}_offsets"][row + 1]
+            record[field] = bytes(a[f"{field}_blob"][start:end]).decode("utf-8")
+        for field in CODED_FIELDS:
+            record[field] = self.vocab[field][a[f"{field}_codes"][row]]
+        skills = self.vocab["skills"]
+        start, end = a["skill_offsets"][row], a["skill_offsets"][row + 1]
+        record["skills_required"] = [skills[c] for c in a["skill_codes"][start:end]]
+        return record
+
+    def index(self):
+        """Scoring index over the stored arrays (no copy, no rebuild)"""
+        a = self.arrays
+        return InternshipIndex.from_arrays(
+            self, a["ids"], a["index_skill_counts"],
+            {s: j for j, s in enumerate(self.vocab["index_skills"])}, a["index_indptr"], a["index_rows"],
+            a["sector_codes"], self.vocab["sector"], a["location_codes"], self.vocab["location"])
+
+
+# --- Versioned catalog directory ---
+@contextmanager
+def catalog_lock(root):
+    """Exclusive lock on the catalog directory, held while writing deltas or versions"""
+    os.makedirs(root, exist_ok=True)
+    with open(os.path.join(root, LOCK_FILE), "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def build_catalog(records, root):
+    """Write a new store version under `root` and point CURRENT at it"""
+    version = f"v{time.time_ns()}"
+    CatalogStore.from_records(records).save(os.path.join(root, version))
+    tmp = os.path.join(root, CURRENT_FILE + ".tmp")
+    with open(tmp, "w") as f:
+        f.write(version)
+    os.replace(tmp, os.path.join(root, CURRENT_FILE))
+    return version
+
+
+def current_version(root):
+    with open(os.path.join(root, CURRENT_FILE)) as f:
+        return f.read().strip()
+
+
+def append_delta(root, records=(), deleted_ids=()):
+    """Append upserts and deletions to the current version's delta log"""
+    # Under the lock, so a compaction cannot switch CURRENT between reading it and writing
+    with catalog_lock(root):
+        path = os.path.join(root, current_version(root), DELTA_FILE)
+        with open(path, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+            for internship_id in deleted_ids:
+                f.write(json.dumps({"id": internship_id, "deleted": True}) + "\n")
+
+
+def prune_versions(root, keep=KEEP_VERSIONS):
+    """Delete all but the newest `keep` version directories (CURRENT always stays); returns their names"""
+    current = current_version(root)
+    versions = sorted((name for name in os.listdir(root) if name.startswith("v") and name[1:].isdigit()),
+                      key=lambda name: int(name[1:]), reverse=True)
+    removed = [name for name in versions[keep:] if name != current]
+    for name in removed:
+        # Servers still mapping the arrays keep reading them: unlinking does not unmap
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+    return removed
+
+
+def compact_catalog(root, keep=KEEP_VERSIONS):
+    """Fold the delta log into a new base version and prune superseded versions
+
+    The lock is held from reading the delta log until CURRENT points at the
+    new version, so no append can land in a log that was already folded.
+    """
+    with catalog_lock(root):
+        version = build_catalog(InternshipCatalog(root).records(), root)
+        prune_versions(root, keep)
+    return version
+
+
+class CatalogSnapshot:
+    """One consistent view of the catalog; never modified after it is published"""
+
+    def __init__(self, store, version=None, overlay=None, deleted=None, delta_offset=0, generation=1,
+                 base_index=None, row_of_id=None):
+        self.store = store
+        self.version = version
+        self.base_index = base_index if base_index is not None else store.index()
+        self.overlay = overlay or {}
+        self.deleted = deleted or set()
+        self.delta_offset = delta_offset
+        self.generation = generation
+        self.overlay_records = list(self.overlay.values())
+        self.overlay_index = InternshipIndex(self.overlay_records)
+        self.row_of_id = row_of_id
+        if self.row_of_id is None and (self.overlay or self.deleted):
+            self.row_of_id = {int(i): row for row, i in enumerate(self.base_index.ids)}
+        hidden = [self.row_of_id[i] for i in set(self.overlay) | self.deleted if i in (self.row_of_id or {})]
+        self.hidden_rows = np.array(hidden, dtype=np.int64)
+
+
+class InternshipCatalog:
+    """Base store plus an in-memory overlay of delta upserts and deletions.
+
+    `refresh()` is cheap (a stat and a small read) and picks up either a new
+    base version or new delta lines; only the overlay index is rebuilt.
+    Readers take `self.snapshot` once per call: refresh builds a complete new
+    CatalogSnapshot under a lock and publishes it with a single assignment,
+    so a query never mixes state from two versions.
+    """
+
+    def __init__(self, root=None, records=None):
+        self.root = root
+        self.last_check = 0.0
+        self.lock = threading.Lock()
+        self.snapshot = None
+        if root is None:
+            self.snapshot = CatalogSnapshot(CatalogStore.from_records(records or []))
+        else:
+            self.refresh(force=True)
+
+    @property
+    def generation(self):
+        """Bumped on every change so caches of query results can invalidate"""
+        return self.snapshot.generation
+
+    def refresh(self, force=False):
+        """Pick up a new base version or appended delta lines; returns True if anything changed
+
+        A non-forced refresh that finds another thread already reloading
+        returns at once and the caller keeps using the current snapshot.
+        """
+        if self.root is None:
+            return False
+        if not self.lock.acquire(blocking=force):
+            return False
+        try:
+            if not force and time.monotonic() - self.last_check < RELOAD_INTERVAL:
+                return False
+            self.last_check = time.monotonic()
+            snap = self.snapshot
+            generation = snap.generation if snap else 0
+            version = current_version(self.root)
+            if snap is None or version != snap.version:
+                store = CatalogStore.open(os.path.join(self.root, version))
+                overlay, deleted, offset, base = {}, set(), 0, (store, None, None)
+            else:
+                overlay, deleted, offset = dict(snap.overlay), set(snap.deleted), snap.delta_offset
+                base = (snap.store, snap.base_index, snap.row_of_id)
+
+            path = os.path.join(self.root, version, DELTA_FILE)
+            if os.path.exists(path) and os.path.getsize(path) > offset:
+                with open(path, encoding="utf-8") as f:
+                    f.seek(offset)
+                    lines = f.readlines()
+                # Leave a partially written last line for the next refresh
+                if lines and not lines[-1].endswith("\n"):
+                    lines.pop()
+                for line in lines:
+                    offset += len(line.encode("utf-8"))
+                    record = json.loads(line)
+                    if record.get("deleted"):
+                        overlay.pop(record["id"], None)
+                        deleted.add(record["id"])
+                    else:
+                        deleted.discard(record["id"])
+                        overlay[record["id"]] = record
+
+            if snap is not None and version == snap.version and offset == snap.delta_offset:
+                return False
+            store, base_index, row_of_id = base
+            self.snapshot = CatalogSnapshot(store, version, overlay, deleted, offset, generation + 1,
+                                            base_index, row_of_id)
+            return True
+        finally:
+            self.lock.release()
+
+    def __len__(self):
+        snap = self.snapshot
+        return len(snap.store) - len(snap.hidden_rows) + len(snap.overlay_records)
+
+    def records(self):
+        """All live internships: base rows not superseded or deleted, then the overlay"""
+        snap = self.snapshot
+        hidden = set(snap.hidden_rows.tolist())
+        for row in range(len(snap.store)):
+            if row not in hidden:
+                yield snap.store[row]
+        yield from snap.overlay_records
+
+    def top_k(self, candidate_profile, k=5):
+        """[(internship dict, score)] for the k best live internships, best first"""
+        snap = self.snapshot
+        rows, scores = snap.base_index.top_k(candidate_profile, k, exclude=snap.hidden_rows)
+        hits = [(float(s), 0, int(r)) for r, s in zip(rows, scores)]
+        if snap.overlay_records:
+            rows, scores = snap.overlay_index.top_k(candidate_profile, k)
+            hits += [(float(s), 1, int(r)) for r, s in zip(rows, scores)]
+        hits.sort(key=lambda h: (-h[0], h[1], h[2]))
+        return [(snap.store[r] if src == 0 else snap.overlay_records[r], s) for s, src, r in hits[:k]]
+
+
+# --- CLI ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and update the internship catalog store")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="build a new base version from a CSV/JSONL file")
+    build.add_argument("source")
+    build.add_argument("root")
+    delta = sub.add_parser("delta", help="append upserts from a CSV/JSONL file to the delta log")
+    delta.add_argument("source")
+    delta.add_argument("root")
+    delta.add_argument("--delete", type=int, nargs="*", default=[], help="internship ids to delete")
+    compact = sub.add_parser("compact", help="fold the delta log into a new base version")
+    compact.add_argument("root")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        with catalog_lock(args.root):
+            version = build_catalog(read_records(args.source), args.root)
+            prune_versions(args.root)
+        print(f"Built {args.root}/{version}")
+    elif args.command == "compact":
+        version = compact_catalog(args.root)
+        print(f"Compacted into {args.root}/{version}")
+    else:
+        records = list(read_records(args.source)) if args.source != "-" else []
+        append_delta(args.root, records, args.delete)
+        print(f"Appended {len(records)} upserts and {len(args.delete)} deletions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import numpy as np
+
+from metrics import timed
+
+SKILL_WEIGHT, SECTOR_WEIGHT, LOCATION_WEIGHT = 0.6, 0.25, 0.15
+
+
+def calculate_similarity(candidate_profile, internship):
+    """Score one internship: the reference definition InternshipIndex.score vectorises"""
+    candidate_skills = [s.strip().lower() for s in candidate_profile.get('skills', '').split(',')]
+    candidate_sector = candidate_profile.get('sector', '').lower()
+    candidate_location = candidate_profile.get('location', '').lower()
+
+    internship_skills = [s.lower() for s in internship['skills_required']]
+    internship_sector = internship['sector'].lower()
+    internship_location = internship['location'].lower()
+
+    skill_matches = len(set(candidate_skills) & set(internship_skills))
+    total_skills = len(set(candidate_skills + internship_skills))
+    skill_similarity = (skill_matches / max(total_skills, 1)) if total_skills > 0 else 0
+
+    sector_similarity = 1.0 if candidate_sector in internship_sector or internship_sector in candidate_sector else 0.0
+    location_similarity = 1.0 if candidate_location in internship_location or internship_location in candidate_location else 0.0
+
+    similarity = (skill_similarity * SKILL_WEIGHT) + (sector_similarity * SECTOR_WEIGHT) + (location_similarity * LOCATION_WEIGHT)
+    return similarity, skill_matches, len(candidate_skills), len(internship_skills)
+
+
+def _encode(values):
+    """Integer-code a column: returns (codes, distinct values)"""
+    lookup, codes = {}, np.empty(len(values), dtype=np.int32)
+    for row, value in enumerate(values):
+        codes[row] = lookup.setdefault(value, len(lookup))
+    return codes, list(lookup)
+
+
+def _substring_match(candidate, values):
+    """The two-way substring rule for sector and location, once per distinct value"""
+    return np.array([1.0 if candidate in v or v in candidate else 0.0 for v in values])
+
+
+class InternshipIndex:
+    """Precomputed scoring structures over a list of internship dicts.
+
+    The skill-incidence matrix is stored column-wise (CSC): the rows holding
+    skill j are ``rows[indptr[j]:indptr[j + 1]]``, which doubles as the
+    inverted index from skill to internships.
+    """
+
+    def __init__(self, internships):
+        internships = list(internships)
+        skills = [sorted({s.lower() for s in i["skills_required"]}) for i in internships]
+        skill_ids, postings = {}, {}
+        for row, row_skills in enumerate(skills):
+            for skill in row_skills:
+                postings.setdefault(skill_ids.setdefault(skill, len(skill_ids)), []).append(row)
+        indptr = np.zeros(len(skill_ids) + 1, dtype=np.int64)
+        for j in range(len(skill_ids)):
+            indptr[j + 1] = indptr[j] + len(postings[j])
+        rows = np.array([r for j in range(len(skill_ids)) for r in postings[j]], dtype=np.int32)
+
+        sector_codes, sectors = _encode([i["sector"].lower() for i in internships])
+        location_codes, locations = _encode([i["location"].lower() for i in internships])
+        self._set_arrays(internships, np.array([i["id"] for i in internships], dtype=np.int64),
+                         np.array([len(s) for s in skills], dtype=np.int32), skill_ids, indptr, rows,
+                         sector_codes, sectors, location_codes, locations)
+
+    @classmethod
+    def from_arrays(cls, internships, ids, skill_counts, skill_ids, indptr, rows,
+                    sector_codes, sectors, location_codes, locations):
+        """Wrap prebuilt (e.g. memory-mapped) arrays without recomputing anything"""
+        index = cls.__new__(cls)
+        index._set_arrays(internships, ids, skill_counts, skill_ids, indptr, rows,
+                          sector_codes, [s.lower() for s in sectors],
+                          location_codes, [l.lower() for l in locations])
+        return index
+
+    def _set_arrays(self, internships, ids, skill_counts, skill_ids, indptr, rows,
+                    sector_codes, sectors, location_codes, locations):
+        self.internships = internships
+        self.ids = ids
+        self.skill_counts = skill_counts
+        self.skill_ids = skill_ids
+        self.indptr = indptr
+        self.rows = rows
+        self.sector_codes, self.sectors = sector_codes, sectors
+        self.location_codes, self.locations = location_codes, locations
+
+    def __len__(self):
+        return len(self.internships)
+
+    def internship_ids_for_skill(self, skill):
+        """Inverted-index lookup: ids of internships requiring `skill`"""
+        j = self.skill_ids.get(skill.lower())
+        if j is None:
+            return self.ids[:0]
+        return self.ids[self.rows[self.indptr[j]:self.indptr[j + 1]]]
+
+    def skill_matches(self, candidate_skills):
+        """Sparse incidence-matrix times candidate indicator vector"""
+        cols = [self.skill_ids[s] for s in candidate_skills if s in self.skill_ids]
+        if not cols:
+            return np.zeros(len(self), dtype=np.int32)
+        hits = np.concatenate([self.rows[self.indptr[j]:self.indptr[j + 1]] for j in cols])
+        return np.bincount(hits, minlength=len(self)).astype(np.int32)
+
+    @timed('internship_score')
+    def score(self, candidate_profile):
+        """Similarity of every internship to the profile, identical to calculate_similarity"""
+        candidate_skills = {s.strip().lower() for s in candidate_profile.get('skills', '').split(',')}
+        candidate_sector = candidate_profile.get('sector', '').lower()
+        candidate_location = candidate_profile.get('location', '').lower()
+
+        matches = self.skill_matches(candidate_skills)
+        union = len(candidate_skills) + self.skill_counts - matches
+        skill_similarity = matches / np.maximum(union, 1)
+        sector_similarity = _substring_match(candidate_sector, self.sectors)[self.sector_codes]
+        location_similarity = _substring_match(candidate_location, self.locations)[self.location_codes]
+
+        return (skill_similarity * SKILL_WEIGHT + sector_similarity * SECTOR_WEIGHT
+                + location_similarity * LOCATION_WEIGHT)
+
+    @timed('internship_top_k')
+    def top_k(self, candidate_profile, k=5, exclude=None):
+        """Row positions and scores of the k best internships, best first (ties keep catalog order)
+
+        Rows listed in `exclude` (e.g. deleted or superseded records) are never returned.
+        """
+        scores = self.score(candidate_profile)
+        if exclude is not None and len(exclude):
+            scores[exclude] = -np.inf
+        if len(scores) > k:
+            kth = scores[np.argpartition(-scores, k - 1)[:k]].min()
+            rows = np.flatnonzero(scores >= kth)
+        else:
+            rows = np.arange(len(scores))
+        rows = rows[np.isfinite(scores[rows])]
+        rows = rows[np.lexsort((rows, -scores[rows]))][:k]
+        return rows, scores[rows]
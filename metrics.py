@@ -0,0 +1,256 @@
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    from flask import g, has_request_context, request
+except ImportError:   # stages can still be timed outside the web apps
+    g = has_request_context = request = None
+
+# APP_METRICS=0 turns everything here into no-ops: decorators return the
+# original function and no request hooks or routes are installed.
+ENABLED = os.environ.get('APP_METRICS', '1') != '0'
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Under a pre-fork server (deploy/gunicorn_*.conf.py) every worker process has
+# its own histograms, and a scrape of /metrics reaches whichever worker accepts
+# it. With METRICS_DIR set to a directory shared by the workers, each process
+# writes its series to <pid>.json there (at most FLUSH_INTERVAL seconds behind)
+# and /metrics serves the sum over every file, so any worker answers for the
+# whole server and Prometheus scrapes the one bind address as a single target.
+# Files of exited workers are kept so counters never go backwards; empty the
+# directory when the server starts (the gunicorn configs do this).
+METRICS_DIR = os.environ.get('METRICS_DIR')
+FLUSH_INTERVAL = 1.0
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set, in the Prometheus model"""
+
+    def __init__(self, name, help_text, buckets=BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.series = {}   # label tuple -> [bucket counts..., sum, count]
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+        if METRICS_DIR:
+            _mark_dirty()
+
+    def snapshot(self):
+        """label tuple -> copy of [bucket counts..., sum, count]"""
+        with self.lock:
+            return {key: list(series) for key, series in self.series.items()}
+
+    def render(self, totals=None):
+        """Exposition text for `totals` (shaped like snapshot(); default this process's own series)"""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        items = (self.snapshot() if totals is None else totals).items()
+        for key, series in items:
+            labels = ','.join(f'{k}="{v}"' for k, v in key)
+            sep = ',' if labels else ''
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{labels}{sep}le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{labels}{sep}le="+Inf"}} {series[-1]}')
+            lines.append(f'{self.name}_sum{{{labels}}} {series[-2]}')
+            lines.append(f'{self.name}_count{{{labels}}} {series[-1]}')
+        return '\n'.join(lines)
+
+
+REQUEST_SECONDS = Histogram('http_request_duration_seconds', 'Request latency by endpoint')
+STAGE_SECONDS = Histogram('app_stage_duration_seconds', 'Time spent in instrumented stages')
+HISTOGRAMS = (REQUEST_SECONDS, STAGE_SECONDS)
+
+
+# --- Shared directory (multi-process servers) ---
+_flush_lock = threading.Lock()
+_start_lock = threading.Lock()
+_flusher = None
+_dirty = False
+
+
+def _flush():
+    """Write this process's series to METRICS_DIR/<pid>.json, replacing the file atomically"""
+    data = {h.name: [[[list(label) for label in key], series] for key, series in h.snapshot().items()]
+            for h in HISTOGRAMS}
+    path = os.path.join(METRICS_DIR, f'{os.getpid()}.json')
+    with _flush_lock:   # the flusher thread and a scrape may both flush
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(data, f)
+        os.replace(path + '.tmp', path)
+
+
+def _flush_if_dirty():
+    global _dirty
+    if _dirty:
+        _dirty = False
+        _flush()
+
+
+def _flush_loop():
+    while True:
+        time.sleep(FLUSH_INTERVAL)
+        _flush_if_dirty()
+
+
+def _mark_dirty():
+    # Started on a process's first observation, so processes that never observe write no file
+    global _dirty, _flusher
+    _dirty = True
+    if _flusher is None:
+        with _start_lock:
+            if _flusher is None:
+                _flusher = threading.Thread(target=_flush_loop, name='metrics-flush', daemon=True)
+                _flusher.start()
+                atexit.register(_flush_if_dirty)
+
+
+def _collect():
+    """histogram name -> series summed over every process's file in METRICS_DIR"""
+    _flush()
+    totals = {h.name: {} for h in HISTOGRAMS}
+    for name in os.listdir(METRICS_DIR):
+        if not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(METRICS_DIR, name)) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for histogram, rows in data.items():
+            merged = totals.get(histogram)
+            if merged is None:
+                continue
+            for key, series in rows:
+                key = tuple(tuple(label) for label in key)
+                total = merged.get(key)
+                merged[key] = series if total is None else [a + b for a, b in zip(total, series)]
+    return totals
+
+
+def _reset_after_fork():
+    # Series copied from the parent are the parent's to report, and a lock may
+    # have been held by its flusher thread, which does not exist in the child
+    global _flush_lock, _start_lock, _flusher, _dirty
+    for h in HISTOGRAMS:
+        h.lock = threading.Lock()
+        h.series = {}
+    _flush_lock = threading.Lock()
+    _start_lock = threading.Lock()
+    _flusher = None
+    _dirty = False
+
+
+if ENABLED and hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+_unrecorded = 0
+
+
+def record_stage(stage, seconds):
+    # Checked here too, for callers that pass in durations measured elsewhere (e.g. in a worker process)
+    if not ENABLED or _unrecorded:
+        return
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    if has_request_context is not None and has_request_context():
+        g.setdefault('server_timing', []).append((stage, seconds))
+
+
+@contextmanager
+def unrecorded():
+    """Record no stages inside the block, from any thread: for warm-up work in a
+    pre-fork master, whose timings are not traffic and would otherwise be
+    flushed to METRICS_DIR and added to every scrape"""
+    global _unrecorded
+    _unrecorded += 1
+    try:
+        yield
+    finally:
+        _unrecorded -= 1
+
+
+@contextmanager
+def span(stage):
+    """Time a block as `stage` (histogram + Server-Timing entry)"""
+    if not ENABLED:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - t0)
+
+
+def timed(stage):
+    """Decorator form of span(); returns the function untouched when metrics are disabled"""
+    def decorator(fn):
+        if not ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record_stage(stage, time.perf_counter() - t0)
+        return wrapper
+    return decorator
+
+
+def _server_timing(entries, total):
+    # Repeated stages (e.g. one per recommendation) are summed into one entry
+    merged = {}
+    for stage, seconds in entries:
+        merged[stage] = merged.get(stage, 0.0) + seconds
+    parts = [f"{stage};dur={seconds * 1000:.3f}" for stage, seconds in merged.items()]
+    parts.append(f"total;dur={total * 1000:.3f}")
+    return ', '.join(parts)
+
+
+def instrument_app(app, app_name):
+    """Install timing hooks, the Server-Timing header and a Prometheus /metrics route"""
+    if not ENABLED:
+        return
+
+    @app.before_request
+    def _start_timer():
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    def _stop_timer(response):
+        start = g.get('request_start')
+        if start is None:
+            return response
+        total = time.perf_counter() - start
+        REQUEST_SECONDS.observe(total, app=app_name, endpoint=request.endpoint or 'unknown',
+                                method=request.method, status=response.status_code)
+        response.headers['Server-Timing'] = _server_timing(g.get('server_timing', []), total)
+        return response
+
+    @app.route('/metrics')
+    def metrics():
+        if METRICS_DIR:
+            totals = _collect()
+            body = ''.join(h.render(totals[h.name]) + '\n' for h in HISTOGRAMS)
+        else:
+            body = ''.join(h.render() + '\n' for h in HISTOGRAMS)
+        return app.response_class(body, mimetype='text/plain; version=0.0.4')
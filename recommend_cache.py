@@ -0,0 +1,49 @@
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_SIZE = 4096
+CACHE_TTL = 300.0
+
+
+def normalize_profile(candidate_profile):
+    """Cache key for a profile: only the fields and normalisation the scorer actually uses"""
+    skills = candidate_profile.get('skills', '')
+    return (tuple(sorted({s.strip().lower() for s in skills.split(',')})),
+            candidate_profile.get('sector', '').lower(),
+            candidate_profile.get('location', '').lower())
+
+
+class RecommendationCache:
+    """LRU cache with a TTL, emptied whenever the catalog generation changes"""
+
+    def __init__(self, size=CACHE_SIZE, ttl=CACHE_TTL):
+        self.size = size
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()    # key -> (expiry, value)
+        self.generation = None
+        self.hits = self.misses = 0
+
+    def get(self, key, generation):
+        with self.lock:
+            if generation != self.generation:
+                self.entries.clear()
+                self.generation = generation
+            entry = self.entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self.entries.pop(key, None)
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, generation, value):
+        with self.lock:
+            if generation != self.generation:
+                return
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
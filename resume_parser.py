@@ -0,0 +1,400 @@
+import hashlib
+import io
+import json
+import os
+import random
+import re
+import sqlite3
+import time
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+from metrics import record_stage, timed
+
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+MAX_PDF_PAGES = 50
+MAX_JOBS = 1024
+
+COMMON_SKILLS = ['python','java','javascript','html','css','react','angular','node.js','data analysis','machine learning','sql','excel','powerpoint','word','communication','teamwork','leadership','problem solving','creativity','accounting','finance','marketing','sales','research','writing','photoshop','illustrator','cad','autocad','design','project management']
+# (pattern, label) in priority order; the first pattern found anywhere wins
+EDUCATION_PATTERNS = [(r'b\.?tech|bachelor.*technology|engineering', "B.Tech/Engineering"),
+                      (r'b\.?sc|bachelor.*science', "Graduate"),
+                      (r'b\.?com|bachelor.*commerce', "Graduate"),
+                      (r'b\.?a|bachelor.*arts', "Graduate"),
+                      (r'm\.?tech|master.*technology', "B.Tech/Engineering"),
+                      (r'm\.?sc|master.*science', "Post Graduate"),
+                      (r'mba|master.*business', "MBA"),
+                      (r'diploma', "Diploma"),
+                      (r'12th|intermediate|higher.*secondary', "12th Pass"),
+                      (r'10th|matriculation|secondary', "Not specified")]
+# JSON file with optional "skills" and "education" ([[pattern, label], ...]) keys
+VOCABULARY_ENV = 'RESUME_VOCABULARY'
+
+
+class ResumeTooLarge(ValueError):
+    pass
+
+
+# --- Parsing (runs in worker processes) ---
+def extract_text(filename, data):
+    """Plain text of a .pdf, .docx or text upload"""
+    if filename.endswith('.pdf'):
+        import pypdf
+        pdf_reader = pypdf.PdfReader(io.BytesIO(data))
+        if len(pdf_reader.pages) > MAX_PDF_PAGES:
+            raise ResumeTooLarge(f"PDF has {len(pdf_reader.pages)} pages; the limit is {MAX_PDF_PAGES}")
+        return "\n".join(page.extract_text() for page in pdf_reader.pages) + "\n"
+    elif filename.endswith('.docx'):
+        from docx import Document
+        doc = Document(io.BytesIO(data))
+        return "\n".join(para.text for para in doc.paragraphs) + "\n"
+    else:
+        return data.decode('utf-8', errors='ignore')
+
+
+WORD_RE = re.compile(r'[a-z0-9+#]+')
+WORD_CHARS = frozenset('abcdefghijklmnopqrstuvwxyz0123456789+#')
+# Vocabularies up to this size are matched by substring search; tokenising the
+# whole text only pays for itself once there are more skills than this
+SCAN_MAX_SKILLS = 48
+MAX_LISTED_SKILLS = 10
+
+
+class ResumeMatcher:
+    """Finds vocabulary skills and the education level, matching whole words only.
+
+    A skill is a sequence of tokens ([a-z0-9+#] runs), so 'css' does not
+    match 'access' and 'node.js' also matches 'node js'. Small vocabularies
+    (the default one included) are checked skill by skill: str.find on the
+    skill as written plus a boundary test, with a compiled regex only when
+    that first hit is inside another word. Larger ones are compiled to token
+    n-gram tuples and matched by set lookups, whose cost does not grow with
+    vocabulary size. Education patterns are tried in priority order and the
+    first whole-word hit wins.
+    """
+
+    def __init__(self, skills=COMMON_SKILLS, education=EDUCATION_PATTERNS):
+        self.skills = list(skills)
+        self.scan = len(self.skills) <= SCAN_MAX_SKILLS
+        self.literals = {}      # token tuple -> (vocabulary position, lowercase skill, first token, regex)
+        self.unigrams = {}      # token -> vocabulary position
+        self.ngrams = {}        # n -> {token tuple: vocabulary position}
+        for i, skill in enumerate(self.skills):
+            gram = tuple(WORD_RE.findall(skill.lower()))
+            if not gram:
+                continue
+            if self.scan:
+                if gram not in self.literals:
+                    # Literal first so re can use its fast prefix search; the lookbehind checks the left edge
+                    head = re.escape(gram[0])
+                    rest = ''.join(rf'[^a-z0-9+#]+{re.escape(t)}' for t in gram[1:])
+                    regex = re.compile(rf'{head}(?<![a-z0-9+#]{head}){rest}(?![a-z0-9+#])')
+                    # A plain one-word skill cannot match anywhere its spelling is absent
+                    first = None if gram == (skill.lower(),) else gram[0]
+                    self.literals[gram] = (i, skill.lower(), first, regex)
+            elif len(gram) == 1:
+                self.unigrams.setdefault(gram[0], i)
+            else:
+                self.ngrams.setdefault(len(gram), {}).setdefault(gram, i)
+
+        self.education = [(re.compile(rf'(?:{pattern})\b'), label) for pattern, label in education]
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, encoding='utf-8') as f:
+            config = json.load(f)
+        return cls(config.get('skills', COMMON_SKILLS),
+                   [tuple(p) for p in config.get('education', EDUCATION_PATTERNS)])
+
+    def _scan_skills(self, text_lower, limit):
+        # Entries are in vocabulary order, so the scan can stop once `limit` skills are found
+        found = []
+        for i, literal, first, regex in self.literals.values():
+            if len(found) == limit:
+                break
+            pos = text_lower.find(literal)
+            if pos != -1:
+                end = pos + len(literal)
+                if (pos == 0 or text_lower[pos - 1] not in WORD_CHARS) and text_lower[end:end + 1] not in WORD_CHARS:
+                    found.append(i)
+                    continue
+            elif first is None or first not in text_lower:
+                continue
+            # The first hit is inside another word ('css' in 'access'), or a phrase is spelled differently
+            if regex.search(text_lower, pos + 1 if first is None else 0):
+                found.append(i)
+        return [self.skills[i] for i in found]
+
+    def _token_skills(self, tokens):
+        found = {self.unigrams[t] for t in self.unigrams.keys() & set(tokens)}
+        for n, grams in self.ngrams.items():
+            window = set(zip(*(tokens[k:] for k in range(n))))
+            found.update(grams[g] for g in grams.keys() & window)
+        return [self.skills[i] for i in sorted(found)]
+
+    def find_skills(self, text_lower, limit=None):
+        """The first `limit` (default all) vocabulary skills present in `text_lower`, in vocabulary order"""
+        if self.scan:
+            return self._scan_skills(text_lower, limit)
+        return self._token_skills(WORD_RE.findall(text_lower))[:limit]
+
+    def find_education(self, text_lower):
+        for regex, label in self.education:
+            # Patterns start with a literal, so re finds candidates fast; only the left edge needs checking
+            m = regex.search(text_lower)
+            while m:
+                start = m.start()
+                if start == 0 or not (text_lower[start - 1].isalnum() or text_lower[start - 1] == '_'):
+                    return label
+                m = regex.search(text_lower, start + 1)
+        return "Not specified"
+
+    def match(self, text):
+        text_lower = text.lower()
+        found_skills = self.find_skills(text_lower, MAX_LISTED_SKILLS)
+        return {'skills': ', '.join(found_skills), 'education': self.find_education(text_lower)}
+
+
+MATCHER = ResumeMatcher.from_file(os.environ[VOCABULARY_ENV]) if os.environ.get(VOCABULARY_ENV) else ResumeMatcher()
+
+
+def _extract_text_timed(filename, data):
+    # Worker-side timing travels back with the result; the child's metrics are not visible
+    t0 = time.perf_counter()
+    text = extract_text(filename, data)
+    return text, time.perf_counter() - t0
+
+
+@timed('resume_match')
+def analyze_text(text):
+    """Skills and education level found in resume text"""
+    return MATCHER.match(text)
+
+
+# --- Job queue ---
+PENDING, DONE, FAILED = 'pending', 'done', 'failed'
+POLL_INTERVAL = 0.1
+# A job still pending after this long lost its parser (the server process that
+# owned it exited); report it as failed instead of leaving the client polling
+STALE_JOB_SECONDS = 600
+
+
+class ResumeJobStore:
+    """SQLite record of every job's status and extracted text.
+
+    With a file `path` shared by all server processes, a poll can land on any
+    gunicorn worker, and an upload already parsed by any of them is reused.
+    Without one the database is private to this process (in memory).
+    """
+
+    def __init__(self, path=None, max_jobs=MAX_JOBS):
+        self.path = path
+        self.max_jobs = max_jobs
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        # The in-memory database exists only as long as its one connection
+        self.db = self._connect() if path is None else None
+
+    def _connect(self):
+        db = sqlite3.connect(self.path or ':memory:', timeout=30, check_same_thread=False)
+        if self.path is not None:
+            db.execute("PRAGMA journal_mode=WAL")
+        db.executescript("""
+            CREATE TABLE IF NOT EXISTS resume_jobs (
+                job_id TEXT PRIMARY KEY,
+                digest TEXT NOT NULL,
+                status TEXT NOT NULL,
+                created REAL NOT NULL,
+                text TEXT,
+                error TEXT,
+                error_type TEXT
+            );
+            CREATE INDEX IF NOT EXISTS resume_jobs_digest ON resume_jobs (digest, status);
+        """)
+        return db
+
+    def _execute(self, *statements):
+        """Run (sql, params) statements in one transaction and return the first one's rows"""
+        if self.path is None:
+            with self.lock:
+                return self._run(self.db, statements)
+        # One connection per thread and process; SQLite's file locks order the writers
+        pid, db = getattr(self.local, 'conn', (None, None))
+        if pid != os.getpid():
+            db = self._connect()
+            self.local.conn = (os.getpid(), db)
+        return self._run(db, statements)
+
+    @staticmethod
+    def _run(db, statements):
+        with db:
+            results = [db.execute(sql, params).fetchall() for sql, params in statements]
+        return results[0]
+
+    def create(self, job_id, digest, text=None):
+        """Record a new job: done already if `text` is given, pending otherwise"""
+        self._execute(("INSERT INTO resume_jobs (job_id, digest, status, created, text) VALUES (?, ?, ?, ?, ?)",
+                       (job_id, digest, PENDING if text is None else DONE, time.time(), text)),
+                      ("DELETE FROM resume_jobs WHERE rowid <= (SELECT MAX(rowid) FROM resume_jobs) - ?",
+                       (self.max_jobs,)))
+
+    def finish(self, job_id, text):
+        self._execute(("UPDATE resume_jobs SET status = ?, text = ? WHERE job_id = ?", (DONE, text, job_id)))
+
+    def fail(self, job_id, error, error_type):
+        self._execute(("UPDATE resume_jobs SET status = ?, error = ?, error_type = ? WHERE job_id = ?",
+                       (FAILED, error, error_type, job_id)))
+
+    def get(self, job_id):
+        """{"status", "created", "text", "error", "error_type"} of a job, or None if unknown"""
+        rows = self._execute(("SELECT status, created, text, error, error_type FROM resume_jobs WHERE job_id = ?",
+                              (job_id,)))
+        return dict(zip(('status', 'created', 'text', 'error', 'error_type'), rows[0])) if rows else None
+
+    def cached_text(self, digest):
+        """Extracted text of an earlier upload with the same content hash, or None"""
+        rows = self._execute(("SELECT text FROM resume_jobs WHERE digest = ? AND status = ? LIMIT 1", (digest, DONE)))
+        return rows[0][0] if rows else None
+
+
+class ResumeJobQueue:
+    """Parses uploads in a process pool; job state and extracted text live in a ResumeJobStore"""
+
+    def __init__(self, workers=None, store=None):
+        self.workers = workers
+        self.store = store if store is not None else ResumeJobStore()
+        self.pool = None
+        self.lock = threading.Lock()
+        self.futures = {}   # job id -> Future of (extracted text, parse seconds), while running here
+
+    def _executor(self):
+        # Created lazily so a pre-fork server does not share one pool across workers
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self.pool
+
+    def submit(self, filename, data):
+        """Queue an upload and return its job id"""
+        if len(data) > MAX_UPLOAD_BYTES:
+            raise ResumeTooLarge(f"File is {len(data)} bytes; the limit is {MAX_UPLOAD_BYTES}")
+        digest = hashlib.sha256(data).hexdigest()
+        job_id = uuid.uuid4().hex
+        text = self.store.cached_text(digest)
+        if text is not None:
+            self.store.create(job_id, digest, text)
+            return job_id
+        self.store.create(job_id, digest)
+        with self.lock:
+            try:
+                future = self._executor().submit(_extract_text_timed, filename, data)
+            except BrokenProcessPool:
+                # A worker died (OOM, crash in a PDF library); the pool refuses all
+                # further work, so replace it and retry once on a fresh one
+                self.pool.shutdown(wait=False, cancel_futures=True)
+                self.pool = None
+                future = self._executor().submit(_extract_text_timed, filename, data)
+            self.futures[job_id] = future
+        # Outside the lock: the callback runs inline if the job already finished
+        future.add_done_callback(lambda f: self._store_result(job_id, f))
+        return job_id
+
+    def _store_result(self, job_id, future):
+        try:
+            text, parse_seconds = future.result()
+        except Exception as e:
+            # The type survives the trip back from the worker so callers can map limit errors
+            self.store.fail(job_id, str(e), type(e).__name__)
+        else:
+            self.store.finish(job_id, text)
+            record_stage('resume_parse', parse_seconds)
+        with self.lock:
+            self.futures.pop(job_id, None)
+
+    def poll(self, job_id, timeout=0):
+        """Job status dict (None for an unknown id); waits up to `timeout` seconds"""
+        with self.lock:
+            future = self.futures.get(job_id)
+        if future is not None:
+            # Submitted from this process: wait on the future, not for its row to be written
+            try:
+                text = future.result(timeout=timeout)[0]
+            except FutureTimeout:
+                return {'status': PENDING}
+            except Exception as e:
+                return {'status': FAILED, 'error': str(e), 'error_type': type(e).__name__}
+            return {'status': DONE, 'extracted_data': analyze_text(text)}
+
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.store.get(job_id)
+            if job is None:
+                return None
+            if job['status'] != PENDING or time.monotonic() >= deadline:
+                break
+            time.sleep(POLL_INTERVAL)
+        if job['status'] == DONE:
+            return {'status': DONE, 'extracted_data': analyze_text(job['text'])}
+        if job['status'] == FAILED:
+            return {'status': FAILED, 'error': job['error'], 'error_type': job['error_type']}
+        if time.time() - job['created'] > STALE_JOB_SECONDS:
+            return {'status': FAILED, 'error': 'The server process parsing this resume exited; upload it again',
+                    'error_type': 'JobLost'}
+        return {'status': PENDING}
+
+
+# --- Benchmark ---
+def _analyze_text_substring(text, skills=COMMON_SKILLS):
+    # The per-skill `in` scan and per-pattern re.search loop this module replaced
+    text_lower = text.lower()
+    found_skills = [s for s in skills if s in text_lower]
+    education = "Not specified"
+    for pattern, label in EDUCATION_PATTERNS:
+        if re.search(pattern, text_lower):
+            education = label
+            break
+    return {'skills': ', '.join(found_skills[:10]), 'education': education}
+
+
+def synthetic_resumes(count=500, words=600, seed=0):
+    rng = random.Random(seed)
+    filler = ['experience', 'responsible', 'team', 'project', 'developed', 'managed', 'access', 'database',
+              'keyword', 'wholesales', 'university', 'internship', 'customer', 'report', 'analysis', 'tools']
+    vocabulary = filler * 8 + COMMON_SKILLS + ['B.Tech', 'M.Sc', 'MBA', 'Diploma', '12th']
+    return [' '.join(rng.choice(vocabulary) for _ in range(words)) for _ in range(count)]
+
+
+def synthetic_skills(count, seed=0):
+    """COMMON_SKILLS padded with random made-up skills, to see how each matcher scales"""
+    rng = random.Random(seed)
+    word = lambda: ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(4, 9)))
+    extra = [word() if rng.random() < 0.7 else f"{word()} {word()}" for _ in range(count - len(COMMON_SKILLS))]
+    return COMMON_SKILLS + extra
+
+
+def benchmark(vocabulary_sizes=(500, 2000), count=500, words=600):
+    """Seconds to analyse `count` synthetic resumes with COMMON_SKILLS and with padded vocabularies"""
+    corpus = synthetic_resumes(count, words)
+    rows = []
+    for size in (None,) + tuple(vocabulary_sizes):
+        skills = COMMON_SKILLS if size is None else synthetic_skills(size)
+        matcher = ResumeMatcher(skills)
+        row = {'vocabulary': 'default' if size is None else f'padded {size}', 'skills': len(skills),
+               'path': 'scan' if matcher.scan else 'tokens'}
+        for name, fn in (('substring', lambda t: _analyze_text_substring(t, skills)), ('compiled', matcher.match)):
+            t0 = time.perf_counter()
+            for text in corpus:
+                fn(text)
+            row[name] = time.perf_counter() - t0
+        rows.append(row)
+    return rows
+
+
+if __name__ == '__main__':
+    print(f"{'vocabulary':<12} {'skills':>7} {'path':>7} {'substring ms':>13} {'compiled ms':>12} {'speedup':>8}"
+          f"   (500 synthetic resumes)")
+    for row in benchmark():
+        print(f"{row['vocabulary']:<12} {row['skills']:>7} {row['path']:>7} {row['substring'] * 1000:>13.1f} "
+              f"{row['compiled'] * 1000:>12.1f} {row['substring'] / row['compiled']:>7.1f}x")
@@ -0,0 +1,85 @@
+import time
+
+
+# --- Number theory ---
+def egcd(a, b):
+    """Iterative extended Euclid: returns (g, x, y) with a*x + b*y == g"""
+    x0, x1, y0, y1 = 1, 0, 0, 1
+    while b:
+        q, a, b = a // b, b, a % b
+        x0, x1 = x1, x0 - q * x1
+        y0, y1 = y1, y0 - q * y1
+    return a, x0, y0
+
+
+def mod_inv(a, m):
+    g, x, _ = egcd(a % m, m)
+    if g != 1:
+        raise ValueError("No modular inverse")
+    return x % m
+
+
+def mod_pow(base, exp, mod):
+    return pow(base, exp, mod)
+
+
+# --- RSA ---
+def make_private_key(p, q, e):
+    """Private key with CRT components: (N, d, p, q, dp, dq, qinv)"""
+    phi = (p - 1) * (q - 1)
+    d = mod_inv(e, phi)
+    return p * q, d, p, q, d % (p - 1), d % (q - 1), mod_inv(q, p)
+
+
+def rsa_encrypt(m, e, N):
+    return pow(m, e, N)
+
+
+def rsa_decrypt(c, key):
+    """CRT decryption (Garner's recombination) with a make_private_key tuple"""
+    N, d, p, q, dp, dq, qinv = key
+    m1 = pow(c, dp, p)
+    m2 = pow(c, dq, q)
+    h = (qinv * (m1 - m2)) % p
+    return m2 + h * q
+
+
+# --- Microbenchmark ---
+def _mod_pow_loop(base, exp, mod):
+    # The hand-written square-and-multiply that shors.py used before
+    result = 1
+    b = base % mod
+    while exp > 0:
+        if exp & 1:
+            result = (result * b) % mod
+        b = (b * b) % mod
+        exp >>= 1
+    return result
+
+
+def benchmark(modulus_bits=(512, 1024, 2048), repeats=20, e=65537):
+    """Time one decryption per method for each modulus size; returns rows of ms"""
+    from rsa_keygen import generate_keypair
+
+    rows = []
+    for bits in modulus_bits:
+        p, q, N, d = generate_keypair(bits // 2, e)
+        key = make_private_key(p, q, e)
+        c = rsa_encrypt(42, e, N)
+        row = {"bits": bits}
+        for name, fn in (("loop", lambda: _mod_pow_loop(c, d, N)),
+                         ("pow", lambda: pow(c, d, N)),
+                         ("crt", lambda: rsa_decrypt(c, key))):
+            t0 = time.perf_counter()
+            for _ in range(repeats):
+                assert fn() == 42
+            row[name] = (time.perf_counter() - t0) / repeats * 1000
+        rows.append(row)
+    return rows
+
+
+if __name__ == "__main__":
+    print(f"{'bits':>6} {'loop ms':>10} {'pow ms':>10} {'crt ms':>10} {'crt speedup':>12}")
+    for row in benchmark():
+        print(f"{row['bits']:>6} {row['loop']:>10.3f} {row['pow']:>10.3f} {row['crt']:>10.3f} "
+              f"{row['loop'] / row['crt']:>11.1f}x")
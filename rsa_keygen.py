@@ -0,0 +1,104 @@
+import random
+import threading
+from math import gcd
+
+from rsa_core import mod_inv
+from shor_engine import SMALL_PRIMES, is_probable_prime
+
+# Candidates are sieved against these before any Miller-Rabin round runs.
+SIEVE_PRIMES = SMALL_PRIMES[1:]
+SIEVE_WINDOW = 1024
+POOL_SIZE = 8
+PRIME_BIT_SIZES = [8, 16, 24, 32, 64, 128, 256, 512, 1024]
+
+
+# --- Prime generation ---
+def generate_prime(bits, rng=None):
+    """Random probable prime with exactly `bits` bits (sieve window + Miller-Rabin)"""
+    if bits < 2:
+        raise ValueError("bits must be at least 2")
+    rng = rng or random.SystemRandom()
+    if bits <= 10:
+        # Too narrow for a window; just pick from the primes in range.
+        primes = [p for p in range(1 << (bits - 1), 1 << bits) if is_probable_prime(p)]
+        return rng.choice(primes)
+
+    while True:
+        # Odd start with the top two bits set so p * q keeps the full 2*bits length
+        start = rng.getrandbits(bits) | (3 << (bits - 2)) | 1
+        composite = bytearray(SIEVE_WINDOW)   # composite[i] -> start + 2*i
+        for p in SIEVE_PRIMES:
+            # first i with start + 2*i == 0 (mod p)
+            i = (-start * pow(2, -1, p)) % p
+            composite[i::p] = b"\x01" * len(range(i, SIEVE_WINDOW, p))
+        for i in range(SIEVE_WINDOW):
+            if composite[i]:
+                continue
+            candidate = start + 2 * i
+            if candidate.bit_length() != bits:
+                break
+            if is_probable_prime(candidate, rng=rng):
+                return candidate
+
+
+# --- Background prime pool ---
+class PrimePool:
+    """Keeps POOL_SIZE ready-made primes per bit size, refilled by a daemon thread"""
+
+    def __init__(self, bit_sizes=PRIME_BIT_SIZES, size=POOL_SIZE):
+        self.size = size
+        self.pools = {bits: [] for bits in bit_sizes}
+        self.cond = threading.Condition()
+        self.worker = threading.Thread(target=self._fill, name="prime-pool", daemon=True)
+        self.worker.start()
+
+    def _fill(self):
+        rng = random.SystemRandom()
+        while True:
+            with self.cond:
+                while all(len(pool) >= self.size for pool in self.pools.values()):
+                    self.cond.wait()
+                # Smallest bit sizes first: they are cheap and most used
+                bits = min(b for b, pool in self.pools.items() if len(pool) < self.size)
+            prime = generate_prime(bits, rng)
+            with self.cond:
+                self.pools[bits].append(prime)
+                self.cond.notify_all()
+
+    def get(self, bits):
+        """Take a prime from the pool, generating one inline if the pool is empty"""
+        with self.cond:
+            pool = self.pools.setdefault(bits, [])
+            prime = pool.pop() if pool else None
+            self.cond.notify_all()
+        return prime if prime is not None else generate_prime(bits)
+
+    def available(self, bits):
+        with self.cond:
+            return len(self.pools.get(bits, []))
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_prime_pool():
+    """Process-wide pool, started on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = PrimePool()
+        return _pool
+
+
+# --- RSA keys ---
+def generate_keypair(bits, e=17, pool=None, rng=None):
+    """Return (p, q, N, d) with p != q, each prime `bits` bits long and gcd(e, phi) == 1"""
+    take = pool.get if pool is not None else (lambda b: generate_prime(b, rng))
+    while True:
+        p, q = take(bits), take(bits)
+        if p == q:
+            continue
+        phi = (p - 1) * (q - 1)
+        if gcd(e, phi) == 1:
+            return p, q, p * q, mod_inv(e, phi)
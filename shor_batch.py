@@ -0,0 +1,161 @@
+import argparse
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from rsa_core import make_private_key, rsa_decrypt, rsa_encrypt
+from rsa_keygen import generate_keypair
+from shor_engine import factorize, format_timings
+
+# Stages shown in the batch chart; factoring sub-stages are summed into "factoring".
+CHART_STAGES = ["key generation", "factoring", "key recovery", "decryption"]
+MAX_BATCH_BITS = 64
+
+
+# --- Pipeline for one modulus ---
+def attack_modulus(bits, e=17, plaintext=42, seed=None):
+    """Generate, factor and decrypt one `bits`-bit modulus; returns a shors.py-style export record
+
+    `bits` must be even: the modulus is the product of two `bits // 2`-bit
+    primes. With very small primes it can come out a bit shorter, so the
+    record keeps the size asked for in "bits" and the real one in "modulus_bits".
+    """
+    timings = {}
+    t0 = time.perf_counter()
+    p, q, N, d = generate_keypair(bits // 2, e)
+    timings["key generation"] = time.perf_counter() - t0
+    ciphertext = rsa_encrypt(plaintext % N, e, N)
+    logs = [f"Generated RSA keys: N={N} ({N.bit_length()} bits), e={e}, d={d}"]
+
+    result = factorize(N, seed=seed)
+    timings["factoring"] = sum(result["timings"].values())
+    logs.append(f"Eve discovered primes: {result['p']} × {result['q']} (via {result['method']})")
+    logs.append("Stage timings:")
+    logs.extend(format_timings(result["timings"]))
+
+    t0 = time.perf_counter()
+    eve_key = make_private_key(result["p"], result["q"], e)
+    timings["key recovery"] = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    eve_plain = rsa_decrypt(ciphertext, eve_key)
+    timings["decryption"] = time.perf_counter() - t0
+    logs.append(f"Eve unlocked the message: {eve_plain}")
+
+    return {
+        "N": N,
+        "e": e,
+        "plaintext": plaintext,
+        "ciphertext": ciphertext,
+        "p": result["p"],
+        "q": result["q"],
+        "recovered_d": eve_key[1],
+        "recovered_plaintext": eve_plain,
+        "logs": logs,
+        "bits": bits,
+        "modulus_bits": N.bit_length(),
+        "method": result["method"],
+        "timings": timings,
+        "factoring_timings": result["timings"],
+    }
+
+
+def _attack_job(job):
+    return attack_modulus(*job)
+
+
+# --- Batch runner ---
+def check_bit_sizes(bit_sizes):
+    """Raise ValueError unless every size is even and between 8 and MAX_BATCH_BITS"""
+    for bits in bit_sizes:
+        if not 8 <= bits <= MAX_BATCH_BITS:
+            raise ValueError(f"modulus size must be between 8 and {MAX_BATCH_BITS} bits, got {bits}")
+        if bits % 2:
+            raise ValueError(f"modulus size must be even (two primes of bits // 2 each), got {bits}")
+
+
+def run_batch(bit_sizes, per_size=3, workers=None, e=17, plaintext=42, executor=None):
+    """Attack `per_size` fresh moduli for each size in `bit_sizes` across a process pool
+
+    Pass a long-lived `executor` to reuse worker processes between batches.
+    """
+    check_bit_sizes(bit_sizes)
+    jobs = [(bits, e, plaintext, i) for bits in bit_sizes for i in range(per_size)]
+    if executor is not None:
+        return list(executor.map(_attack_job, jobs))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_attack_job, jobs))
+
+
+def summarize(records):
+    """Mean milliseconds per chart stage, keyed by modulus size"""
+    summary = {}
+    for record in records:
+        row = summary.setdefault(record["bits"], {stage: [] for stage in CHART_STAGES})
+        for stage in CHART_STAGES:
+            row[stage].append(record["timings"][stage] * 1000)
+    return {
+        "bits": sorted(summary),
+        **{stage: [sum(summary[b][stage]) / len(summary[b][stage]) for b in sorted(summary)]
+           for stage in CHART_STAGES},
+    }
+
+
+# --- Streamlit tab ---
+def render_batch_tab(st, get_executor=None):
+    st.subheader("📊 Batch Attack — Cost vs Modulus Size")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        min_bits, max_bits = st.slider("Modulus size (bits)", 16, MAX_BATCH_BITS, (16, 56), step=8)
+    with col2:
+        per_size = st.number_input("Moduli per size", min_value=1, max_value=20, value=3)
+    with col3:
+        workers = st.number_input("Worker processes", min_value=1, max_value=32, value=4)
+
+    if st.button("Run Batch Attack"):
+        with st.spinner("Factoring moduli across the process pool..."):
+            executor = get_executor(workers) if get_executor else None
+            st.session_state.batch_records = run_batch(range(min_bits, max_bits + 1, 8), per_size, workers,
+                                                       executor=executor)
+
+    records = st.session_state.get("batch_records")
+    if records:
+        st.line_chart(summarize(records), x="bits", y=CHART_STAGES)
+        st.download_button(
+            label="📥 Export Batch as JSON",
+            data=json.dumps(records, indent=2),
+            file_name="shor_batch.json",
+            mime="application/json"
+        )
+
+
+# --- CLI ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch Shor attack over a range of RSA modulus sizes")
+    parser.add_argument("--min-bits", type=int, default=16)
+    parser.add_argument("--max-bits", type=int, default=MAX_BATCH_BITS)
+    parser.add_argument("--step", type=int, default=8)
+    parser.add_argument("--per-size", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", default="shor_batch.json")
+    args = parser.parse_args(argv)
+    if args.step < 1:
+        parser.error("--step must be at least 1")
+    bit_sizes = range(args.min_bits, args.max_bits + 1, args.step)
+    try:
+        check_bit_sizes(bit_sizes)
+    except ValueError as e:
+        parser.error(str(e))
+
+    records = run_batch(bit_sizes, args.per_size, args.workers)
+    with open(args.output, "w") as f:
+        json.dump(records, f, indent=2)
+
+    summary = summarize(records)
+    print(f"{'bits':>5} " + " ".join(f"{s + ' ms':>16}" for s in CHART_STAGES))
+    for i, bits in enumerate(summary["bits"]):
+        print(f"{bits:>5} " + " ".join(f"{summary[s][i]:>16.3f}" for s in CHART_STAGES))
+    print(f"Wrote {len(records)} records to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
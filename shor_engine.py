@@ -0,0 +1,209 @@
+import math
+import random
+import time
+from fractions import Fraction
+from math import gcd
+
+# Moduli up to this size go through the simulated quantum period finder;
+# anything larger falls back to Pollard-rho (Brent variant).
+PERIOD_FINDING_MAX_BITS = 20
+SMALL_PRIMES = [p for p in range(3, 1000, 2) if all(p % d for d in range(3, int(p**0.5) + 1, 2))]
+SMALL_PRIMES.insert(0, 2)
+# Only strip trivial factors; everything else is left for Shor or Brent.
+TRIAL_PRIMES = SMALL_PRIMES[:11]
+
+# Deterministic Miller-Rabin witnesses, valid for n < 3.3e24
+_MR_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+
+# --- Primality ---
+def is_probable_prime(n, rounds=None, rng=None):
+    """Miller-Rabin test (deterministic below 3.3e24, `rounds` random bases above)"""
+    if n < 2:
+        return False
+    for p in SMALL_PRIMES[:25]:
+        if n % p == 0:
+            return n == p
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+
+    if n < 3317044064679887385961981:
+        bases = _MR_BASES
+    else:
+        rng = rng or random.SystemRandom()
+        bases = [rng.randrange(2, n - 1) for _ in range(rounds or 40)]
+
+    for a in bases:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = pow(x, 2, n)
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+# --- Period finding (simulated QFT) ---
+def classical_order(a, N):
+    """Order r of a mod N by repeated multiplication (stands in for the quantum oracle)"""
+    x, r = a % N, 1
+    while x != 1:
+        x = (x * a) % N
+        r += 1
+    return r
+
+
+def sample_qft_measurement(r, Q, rng, window=3):
+    """Sample y from the QFT output distribution of a period-r register of size Q"""
+    k = rng.randrange(r)
+    centre = round(k * Q / r)
+    M = Q // r
+    candidates, weights = [], []
+    for y in range(centre - window, centre + window + 1):
+        if not 0 <= y < Q:
+            continue
+        delta = (y * r / Q) - k
+        s = math.sin(math.pi * delta)
+        w = float(M * M) if abs(s) < 1e-12 else (math.sin(math.pi * M * delta) / s) ** 2
+        candidates.append(y)
+        weights.append(w)
+    return rng.choices(candidates, weights=weights)[0]
+
+
+def order_from_measurement(y, Q, a, N):
+    """Recover the order of a mod N from a measurement y via continued fractions"""
+    if y == 0:
+        return None
+    s = Fraction(y, Q).limit_denominator(N).denominator
+    # The convergent denominator may be a divisor of r; try small multiples.
+    for m in range(1, 8):
+        if pow(a, s * m, N) == 1:
+            return s * m
+    return None
+
+
+def find_order(a, N, rng, max_measurements=10, timings=None):
+    """Quantum-style order finding: sample QFT peaks, then continued fractions"""
+    timings = timings if timings is not None else {}
+    n = N.bit_length()
+    Q = 1 << (2 * n)
+
+    t0 = time.perf_counter()
+    r_true = classical_order(a, N)
+    timings["order oracle"] = timings.get("order oracle", 0.0) + time.perf_counter() - t0
+
+    r = 1
+    for _ in range(max_measurements):
+        t0 = time.perf_counter()
+        y = sample_qft_measurement(r_true, Q, rng)
+        timings["qft sampling"] = timings.get("qft sampling", 0.0) + time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        s = order_from_measurement(y, Q, a, N)
+        if s is not None:
+            r = r * s // gcd(r, s)
+        timings["continued fractions"] = timings.get("continued fractions", 0.0) + time.perf_counter() - t0
+        if pow(a, r, N) == 1:
+            return r
+    return None
+
+
+def shor_period_factor(N, rng, attempts=20, timings=None):
+    """Factor N with Shor's reduction from factoring to order finding"""
+    for _ in range(attempts):
+        a = rng.randrange(2, N - 1)
+        g = gcd(a, N)
+        if g > 1:
+            return g, N // g
+        r = find_order(a, N, rng, timings=timings)
+        if r is None or r % 2:
+            continue
+        x = pow(a, r // 2, N)
+        if x == N - 1:
+            continue
+        for f in (gcd(x - 1, N), gcd(x + 1, N)):
+            if 1 < f < N:
+                return f, N // f
+    return None, None
+
+
+# --- Pollard-rho / Brent fallback ---
+def pollard_brent(N, rng, batch=128):
+    """Return a non-trivial factor of composite N using Brent's cycle detection"""
+    if N % 2 == 0:
+        return 2
+    while True:
+        y, c = rng.randrange(1, N), rng.randrange(1, N)
+        g, r, q = 1, 1, 1
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % N
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                for _ in range(min(batch, r - k)):
+                    y = (y * y + c) % N
+                    q = q * abs(x - y) % N
+                g = gcd(q, N)
+                k += batch
+            r <<= 1
+        if g == N:
+            g = 1
+            while g == 1:
+                ys = (ys * ys + c) % N
+                g = gcd(abs(x - ys), N)
+        if g != N:
+            return g
+
+
+# --- Entry point ---
+def factorize(N, seed=None):
+    """Split N = p * q and report which method was used and how long each stage took"""
+    rng = random.Random(seed)
+    timings = {}
+    result = {"N": N, "p": None, "q": None, "method": None, "timings": timings}
+    if N < 4:
+        return result
+
+    t0 = time.perf_counter()
+    for p in TRIAL_PRIMES:
+        if p * p > N:
+            break
+        if N % p == 0:
+            timings["trial division"] = time.perf_counter() - t0
+            result.update(p=p, q=N // p, method="trial division")
+            return result
+    timings["trial division"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    prime = is_probable_prime(N)
+    timings["primality test"] = time.perf_counter() - t0
+    if prime:
+        return result
+
+    p = None
+    if N.bit_length() <= PERIOD_FINDING_MAX_BITS:
+        p, q = shor_period_factor(N, rng, timings=timings)
+        method = "shor period finding"
+    if N.bit_length() > PERIOD_FINDING_MAX_BITS or p is None:
+        t0 = time.perf_counter()
+        p = pollard_brent(N, rng)
+        q = N // p
+        timings["pollard-brent"] = time.perf_counter() - t0
+        method = "pollard-brent"
+
+    if p is not None:
+        p, q = sorted((p, q))
+        result.update(p=p, q=q, method=method)
+    return result
+
+
+def format_timings(timings):
+    """Render stage timings as Technical Log lines"""
+    return [f"  {stage}: {seconds * 1000:.3f} ms" for stage, seconds in timings.items()]